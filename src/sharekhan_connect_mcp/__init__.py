@@ -4,6 +4,7 @@ A Model Context Protocol (MCP) server for Sharekhan trading APIs
 """
 
 from .client import SharekhanClient
+from .client_async import AsyncSharekhanClient
 from .server import SharekhanMCPServer
 from .session import SharekhanSessionManager
 from .tools import SharekhanMCPTools
@@ -14,6 +15,7 @@ __author__ = "Sharekhan MCP Team"
 __license__ = "MIT"
 
 __all__ = [
+    "AsyncSharekhanClient",
     "SharekhanClient",
     "SharekhanMCPServer",
     "SharekhanMCPTools",
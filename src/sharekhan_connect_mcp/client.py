@@ -3,80 +3,188 @@ Sharekhan API Client
 Replaces KiteConnect functionality with Sharekhan APIs
 """
 
-import os
-import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, cast
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from urllib.parse import urlencode
 
+import ijson
+import orjson
 import requests
+from cachetools import TTLCache
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from datetime import date
+
+BASE_URL = "https://api.sharekhan.com/v1"
+
+# API endpoints, relative to BASE_URL; shared with AsyncSharekhanClient
+ENDPOINTS: Dict[str, str] = {
+    "login": "/auth/login",
+    "session": "/auth/session",
+    "token": "/auth/token",
+    "holdings": "/portfolio/holdings",
+    "positions": "/portfolio/positions",
+    "orders": "/orders",
+    "trades": "/orders/trades",
+    "history": "/market/history",
+    "quote": "/market/quote",
+    "master": "/master",
+    "order_details": "/orders/details",
+    "order_trades": "/orders/trades/by-order",
+    "websocket": "/stream/websocket",
+}
 
 
 class SharekhanClient:
     """Sharekhan API client replacing KiteConnect functionality"""
 
-    def __init__(self, api_key: str, secret_key: str, vendor_key: Optional[str] = None):
+    # Response cache TTLs (seconds): the script master is effectively static
+    # for a trading day, while quotes go stale almost immediately
+    MASTER_CACHE_TTL = 3600
+    HISTORY_CACHE_TTL = 60
+    QUOTE_CACHE_TTL = 1
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        vendor_key: Optional[str] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
         self.api_key = api_key
         self.secret_key = secret_key
         self.vendor_key = vendor_key
-        self.access_token: Optional[str] = None
+        self.access_token = None
         self.session_token: Optional[str] = None
-        self.base_url = "https://api.sharekhan.com/v1"
+        self.base_url = BASE_URL
 
         # API endpoints
-        self.endpoints = {
-            "login": "/auth/login",
-            "session": "/auth/session",
-            "token": "/auth/token",
-            "holdings": "/portfolio/holdings",
-            "positions": "/portfolio/positions",
-            "orders": "/orders",
-            "trades": "/orders/trades",
-            "history": "/market/history",
-            "quote": "/market/quote",
-            "websocket": "/stream/websocket",
+        self.endpoints = dict(ENDPOINTS)
+        self._urls = {k: self.base_url + v for k, v in self.endpoints.items()}
+
+        # Pooled HTTP session so repeated calls reuse keep-alive connections.
+        # Transient failures are retried with backoff on the same pool; POST is
+        # left out so an order is never submitted twice.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=retry_delay,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "PUT", "DELETE"],
+            raise_on_status=False,
+        )
+        # The default Accept-Encoding advertises gzip, and br once brotli is
+        # installed, so large master/history payloads arrive compressed
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        # pool_maxsize covers the default executor's worker cap (32), which is
+        # how many threads async callers can have in flight on this session
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry),
+        )
+
+        # In-process TTL caches for read-only market data
+        self._cache_lock = threading.RLock()
+        self._master_cache: TTLCache = TTLCache(maxsize=16, ttl=self.MASTER_CACHE_TTL)
+        self._history_cache: TTLCache = TTLCache(
+            maxsize=512, ttl=self.HISTORY_CACHE_TTL
+        )
+        self._quote_cache: TTLCache = TTLCache(maxsize=512, ttl=self.QUOTE_CACHE_TTL)
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Current access token"""
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, value: Optional[str]) -> None:
+        # Rebuild the auth headers only when the token changes, not per request
+        self._access_token: Optional[str] = value
+        self._cached_headers: Dict[str, str] = {
+            "Authorization": f"Bearer {value}",
+            "Content-Type": "application/json",
+            "X-API-Key": self.api_key,
         }
 
-    def login_url(
-        self, vendor_key: str = "", version_id: str = "1005", state: str = "12345"
-    ) -> str:
-        """Generate login URL for Sharekhan authentication (matches SharekhanConnect API)"""
+    def invalidate_cache(self) -> None:
+        """Drop all cached master, quote and historical data responses"""
+        with self._cache_lock:
+            self._master_cache.clear()
+            self._history_cache.clear()
+            self._quote_cache.clear()
+
+    def cached_quote(self, exchange: str, scrip_code: str) -> Optional[Dict[str, Any]]:
+        """Return a quote still inside its cache TTL, without making a request"""
+        with self._cache_lock:
+            blob = self._quote_cache.get((exchange, scrip_code))
+        if blob is None:
+            return None
+        quote: Dict[str, Any] = orjson.loads(blob)
+        return quote
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and release pooled connections"""
+        self._session.close()
+
+    def __enter__(self) -> "SharekhanClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def login_redirect_url(self, state: str = "12345", version_id: str = "1005") -> str:
+        """Generate login URL carrying only the OAuth redirect parameters"""
         params = {
             "api_key": self.api_key,
-            "vendor_key": vendor_key or self.vendor_key or "",
             "version_id": version_id,
             "state": state,
             "redirect_uri": "http://localhost:8080/auth/callback",
         }
 
-        url = f"{self.base_url}{self.endpoints['login']}"
+        url = self._urls["login"]
         logger.info(f"Generated login URL: {url}")
-        return f"{url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+        return f"{url}?{urlencode(params)}"
+
+    def login_url(
+        self, vendor_key: str = "", version_id: str = "1005", state: str = "12345"
+    ) -> str:
+        """Generate login URL for Sharekhan authentication (matches SharekhanConnect API)"""
+        vendor_key = vendor_key or self.vendor_key or ""
+        url = self.login_redirect_url(state=state, version_id=version_id)
+
+        # Only vendor logins need the vendor key in the query string
+        if vendor_key:
+            url = f"{url}&{urlencode({'vendor_key': vendor_key})}"
+        return url
 
     def get_login_url(self, version_id: str = "1005") -> str:
         """Generate login URL for Sharekhan authentication (legacy method)"""
-        return self.login_url(version_id=version_id)
+        return self.login_redirect_url(version_id=version_id)
 
     def generate_session(
         self, request_token: str, secret_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate session using request token (matches SharekhanConnect API)"""
         try:
-            url = f"{self.base_url}{self.endpoints['session']}"
+            url = self._urls["session"]
             payload = {
                 "api_key": self.api_key,
                 "request_token": request_token,
                 "secret_key": secret_key or self.secret_key,
             }
 
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._session.post(url, json=payload, timeout=30)
             response.raise_for_status()
 
-            session_data = response.json()
+            session_data: Dict[str, Any] = response.json()
             self.session_token = session_data.get("session_token")
 
             logger.info("Session generated successfully")
-            return cast(Dict[str, Any], session_data)
+            return session_data
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to generate session: {e}")
@@ -93,13 +201,13 @@ class SharekhanClient:
     ) -> str:
         """Get access token using session (matches SharekhanConnect API)"""
         try:
-            url = f"{self.base_url}{self.endpoints['token']}"
+            url = self._urls["token"]
             payload = {"api_key": api_key, "session_token": session, "state": state}
 
             if versionId:
                 payload["versionId"] = versionId
 
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._session.post(url, json=payload, timeout=30)
             response.raise_for_status()
 
             token_data: Dict[str, Any] = response.json()
@@ -119,7 +227,7 @@ class SharekhanClient:
     def _make_request(
         self,
         method: str,
-        endpoint: str,
+        url: str,
         params: Optional[Dict] = None,
         data: Optional[Dict] = None,
     ) -> Dict[str, Any]:
@@ -127,24 +235,25 @@ class SharekhanClient:
         if not self.access_token:
             raise ValueError("Access token not available. Please authenticate first.")
 
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
-
-        url = f"{self.base_url}{endpoint}"
-
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=headers,
+                headers=self._cached_headers,
                 params=params,
-                json=data,
+                data=orjson.dumps(data) if data is not None else None,
                 timeout=30,
             )
             response.raise_for_status()
-            return cast(Dict[str, Any], response.json())
+            try:
+                body: Dict[str, Any] = orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
+                # Same exception response.json() raises, so callers catching
+                # RequestException still see non-JSON bodies
+                raise requests.exceptions.JSONDecodeError(
+                    e.msg, e.doc, e.pos, request=response.request, response=response
+                ) from e
+            return body
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
@@ -152,16 +261,13 @@ class SharekhanClient:
 
     def requestHeaders(self) -> Dict[str, str]:
         """Get request headers (matches SharekhanConnect API)"""
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-            "X-API-Key": self.api_key,
-        }
+        # A copy, so callers cannot alter the headers every request shares
+        return dict(self._cached_headers)
 
     # Trading Operations (matches SharekhanConnect API)
     def placeOrder(self, orderparams: Dict[str, Any]) -> Dict[str, Any]:
         """Place an order (matches SharekhanConnect API)"""
-        return self._make_request("POST", self.endpoints["orders"], data=orderparams)
+        return self._make_request("POST", self._urls["orders"], data=orderparams)
 
     def place_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Place an order (legacy method)"""
@@ -173,8 +279,8 @@ class SharekhanClient:
         if not order_id:
             raise ValueError("orderId is required in orderparams")
 
-        endpoint = f"{self.endpoints['orders']}/{order_id}"
-        return self._make_request("PUT", endpoint, data=orderparams)
+        url = f"{self._urls['orders']}/{order_id}"
+        return self._make_request("PUT", url, data=orderparams)
 
     def modify_order(self, order_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Modify an existing order (legacy method)"""
@@ -187,47 +293,72 @@ class SharekhanClient:
         if not order_id:
             raise ValueError("orderId is required in orderparams")
 
-        endpoint = f"{self.endpoints['orders']}/{order_id}"
-        return self._make_request("DELETE", endpoint, data=orderparams)
+        url = f"{self._urls['orders']}/{order_id}"
+        return self._make_request("DELETE", url, data=orderparams)
 
     def cancel_order(self, order_id: str) -> Dict[str, Any]:
         """Cancel an order (legacy method)"""
         return self.cancelOrder({"orderId": order_id})
 
+    def _get(
+        self,
+        url_key: str,
+        params: Dict[str, Any],
+        result_key: Optional[str] = None,
+        cache: Optional[TTLCache] = None,
+    ) -> Any:
+        """GET an endpoint, unwrapping result_key and memoizing in cache if given"""
+        # Caches hold encoded bytes and every hit decodes a fresh copy, so a
+        # caller mutating its result cannot corrupt what others are served
+        if cache is not None:
+            key = tuple(params.values())
+            with self._cache_lock:
+                blob = cache.get(key)
+            if blob is not None:
+                return orjson.loads(blob)
+
+        result = self._make_request("GET", self._urls[url_key], params=params)
+        value = result if result_key is None else result.get(result_key, [])
+
+        if cache is not None:
+            encoded = orjson.dumps(value)
+            with self._cache_lock:
+                cache[key] = encoded
+        return value
+
     # Portfolio Operations (matches SharekhanConnect API)
     def holdings(self, customerId: str) -> List[Dict[str, Any]]:
         """Get holdings for customer (matches SharekhanConnect API)"""
-        params = {"customer_id": customerId}
-        result = self._make_request("GET", self.endpoints["holdings"], params=params)
-        return cast(List[Dict[str, Any]], result.get("holdings", []))
+        holdings: List[Dict[str, Any]] = self._get(
+            "holdings", {"customer_id": customerId}, "holdings"
+        )
+        return holdings
 
     def positions(self, customerId: str) -> Dict[str, Any]:
         """Get positions for customer (matches SharekhanConnect API)"""
-        params = {"customer_id": customerId}
-        return self._make_request("GET", self.endpoints["positions"], params=params)
+        positions: Dict[str, Any] = self._get("positions", {"customer_id": customerId})
+        return positions
 
     def trades(self, customerId: str) -> List[Dict[str, Any]]:
         """Get trade history for customer (matches SharekhanConnect API)"""
-        params = {"customer_id": customerId}
-        result = self._make_request("GET", self.endpoints["trades"], params=params)
-        return cast(List[Dict[str, Any]], result.get("trades", []))
+        trades: List[Dict[str, Any]] = self._get(
+            "trades", {"customer_id": customerId}, "trades"
+        )
+        return trades
 
     def exchange(self, exchange: str, customerId: str, orderId: str) -> Dict[str, Any]:
         """Get order details (matches SharekhanConnect API)"""
         params = {"exchange": exchange, "customer_id": customerId, "order_id": orderId}
-        return self._make_request(
-            "GET", f"{self.endpoints['orders']}/details", params=params
-        )
+        details: Dict[str, Any] = self._get("order_details", params)
+        return details
 
     def exchangetrades(
         self, exchange: str, customerId: str, orderId: str
     ) -> List[Dict[str, Any]]:
         """Get trades generated by an order (matches SharekhanConnect API)"""
         params = {"exchange": exchange, "customer_id": customerId, "order_id": orderId}
-        result = self._make_request(
-            "GET", f"{self.endpoints['trades']}/by-order", params=params
-        )
-        return cast(List[Dict[str, Any]], result.get("trades", []))
+        trades: List[Dict[str, Any]] = self._get("order_trades", params, "trades")
+        return trades
 
     # Market Data Operations (matches SharekhanConnect API)
     def historicaldata(
@@ -235,30 +366,61 @@ class SharekhanClient:
     ) -> List[Dict[str, Any]]:
         """Get historical market data (matches SharekhanConnect API)"""
         params = {"exchange": exchange, "scripcode": scripcode, "interval": interval}
-        result = self._make_request("GET", self.endpoints["history"], params=params)
-        return cast(List[Dict[str, Any]], result.get("data", []))
+        data: List[Dict[str, Any]] = self._get(
+            "history", params, "data", self._history_cache
+        )
+        return data
+
+    def iter_historicaldata(
+        self, exchange: str, scripcode: str, interval: str
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream historical market data rows without buffering the full response"""
+        if not self.access_token:
+            raise ValueError("Access token not available. Please authenticate first.")
+
+        params = {"exchange": exchange, "scripcode": scripcode, "interval": interval}
+
+        try:
+            with self._session.get(
+                self._urls["history"],
+                headers=self._cached_headers,
+                params=params,
+                stream=True,
+                timeout=30,
+            ) as response:
+                response.raise_for_status()
+                # Let urllib3 undo gzip/br before ijson sees the bytes
+                response.raw.decode_content = True
+                yield from ijson.items(response.raw, "data.item", use_float=True)
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"API request failed: {e}")
+            raise
 
     def historical_data(
         self,
         exchange: str,
         scrip_code: str,
         interval: str,
-        from_date: datetime,
-        to_date: datetime,
+        from_date: "date",
+        to_date: "date",
     ) -> List[Dict[str, Any]]:
         """Get historical market data (legacy method)"""
-        return self.historicaldata(exchange, scrip_code, interval)
+        data: List[Dict[str, Any]] = self.historicaldata(exchange, scrip_code, interval)
+        return data
 
     def quote(self, exchange: str, scrip_code: str) -> Dict[str, Any]:
         """Get market quote"""
         params = {"exchange": exchange, "scrip_code": scrip_code}
-        return self._make_request("GET", self.endpoints["quote"], params=params)
+        quote: Dict[str, Any] = self._get("quote", params, cache=self._quote_cache)
+        return quote
 
     def master(self, exchange: str) -> List[Dict[str, Any]]:
         """Get script master data (matches SharekhanConnect API)"""
-        params = {"exchange": exchange}
-        result = self._make_request("GET", "/master", params=params)
-        return cast(List[Dict[str, Any]], result.get("master", []))
+        master: List[Dict[str, Any]] = self._get(
+            "master", {"exchange": exchange}, "master", self._master_cache
+        )
+        return master
 
     # Order Book Operations
     def orders(self, customer_id: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -266,5 +428,6 @@ class SharekhanClient:
         params = {}
         if customer_id:
             params["customer_id"] = customer_id
-        result = self._make_request("GET", self.endpoints["orders"], params=params)
-        return cast(List[Dict[str, Any]], result.get("orders", []))
+        result = self._make_request("GET", self._urls["orders"], params=params)
+        orders: List[Dict[str, Any]] = result.get("orders", [])
+        return orders
@@ -0,0 +1,276 @@
+"""
+Async Sharekhan API Client
+httpx-based counterpart of SharekhanClient for concurrent API calls
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
+from loguru import logger
+
+from .client import BASE_URL, ENDPOINTS
+
+
+class AsyncSharekhanClient:
+    """Async Sharekhan API client backed by a pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        vendor_key: Optional[str] = None,
+        access_token: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.vendor_key = vendor_key
+        self.access_token: Optional[str] = access_token
+        self.session_token: Optional[str] = None
+        self.base_url = BASE_URL
+
+        # API endpoints, the same table SharekhanClient uses
+        self.endpoints = dict(ENDPOINTS)
+
+        # One bounded connection pool shared by every request; HTTP/2 lets
+        # concurrent calls multiplex as streams over a single TLS connection
+        self._client = httpx.AsyncClient(
+            http2=True,
+            base_url=self.base_url,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and release pooled connections"""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncSharekhanClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def generate_session(
+        self, request_token: str, secret_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate session using request token"""
+        try:
+            url = self.endpoints["session"]
+            payload = {
+                "api_key": self.api_key,
+                "request_token": request_token,
+                "secret_key": secret_key or self.secret_key,
+            }
+
+            response = await self._client.post(url, json=payload)
+            response.raise_for_status()
+
+            session_data: Dict[str, Any] = response.json()
+            self.session_token = session_data.get("session_token")
+
+            logger.info("Session generated successfully")
+            return session_data
+
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to generate session: {e}")
+            raise
+
+    async def get_access_token(
+        self, api_key: str, session: str, state: str, versionId: Optional[str] = None
+    ) -> str:
+        """Get access token using session"""
+        try:
+            url = self.endpoints["token"]
+            payload = {"api_key": api_key, "session_token": session, "state": state}
+
+            if versionId:
+                payload["versionId"] = versionId
+
+            response = await self._client.post(url, json=payload)
+            response.raise_for_status()
+
+            token_data: Dict[str, Any] = response.json()
+            access_token: Optional[str] = token_data.get("access_token")
+
+            if not access_token:
+                raise ValueError("No access token in API response")
+
+            self.access_token = access_token
+            logger.info("Access token obtained successfully")
+            return access_token
+
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get access token: {e}")
+            raise
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """Make authenticated API request"""
+        if not self.access_token:
+            raise ValueError("Access token not available. Please authenticate first.")
+
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+
+        try:
+            response = await self._client.request(
+                method,
+                endpoint,
+                headers=headers,
+                params=params,
+                content=orjson.dumps(data) if data is not None else None,
+            )
+            response.raise_for_status()
+            try:
+                body: Dict[str, Any] = orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
+                # Surface non-JSON bodies as an httpx error like the rest
+                raise httpx.DecodingError(str(e), request=response.request) from e
+            return body
+
+        except httpx.HTTPError as e:
+            logger.error(f"API request failed: {e}")
+            raise
+
+    # Trading Operations
+    async def placeOrder(self, orderparams: Dict[str, Any]) -> Dict[str, Any]:
+        """Place an order"""
+        return await self._make_request(
+            "POST", self.endpoints["orders"], data=orderparams
+        )
+
+    async def placeOrders(
+        self, orderparams_list: List[Dict[str, Any]], return_exceptions: bool = False
+    ) -> List[Any]:
+        """Place several orders concurrently over the shared connection"""
+        results: List[Any] = await asyncio.gather(
+            *(self.placeOrder(p) for p in orderparams_list),
+            return_exceptions=return_exceptions,
+        )
+        return results
+
+    async def modifyOrder(self, orderparams: Dict[str, Any]) -> Dict[str, Any]:
+        """Modify an existing order"""
+        order_id = orderparams.get("orderId")
+        if not order_id:
+            raise ValueError("orderId is required in orderparams")
+
+        endpoint = f"{self.endpoints['orders']}/{order_id}"
+        return await self._make_request("PUT", endpoint, data=orderparams)
+
+    async def cancelOrder(self, orderparams: Dict[str, Any]) -> Dict[str, Any]:
+        """Cancel an order"""
+        order_id = orderparams.get("orderId")
+        if not order_id:
+            raise ValueError("orderId is required in orderparams")
+
+        endpoint = f"{self.endpoints['orders']}/{order_id}"
+        return await self._make_request("DELETE", endpoint, data=orderparams)
+
+    # Portfolio Operations
+    async def holdings(self, customerId: str) -> List[Dict[str, Any]]:
+        """Get holdings for customer"""
+        params = {"customer_id": customerId}
+        result = await self._make_request(
+            "GET", self.endpoints["holdings"], params=params
+        )
+        holdings: List[Dict[str, Any]] = result.get("holdings", [])
+        return holdings
+
+    async def positions(self, customerId: str) -> Dict[str, Any]:
+        """Get positions for customer"""
+        params = {"customer_id": customerId}
+        return await self._make_request(
+            "GET", self.endpoints["positions"], params=params
+        )
+
+    async def trades(self, customerId: str) -> List[Dict[str, Any]]:
+        """Get trade history for customer"""
+        params = {"customer_id": customerId}
+        result = await self._make_request(
+            "GET", self.endpoints["trades"], params=params
+        )
+        trades: List[Dict[str, Any]] = result.get("trades", [])
+        return trades
+
+    async def exchange(
+        self, exchange: str, customerId: str, orderId: str
+    ) -> Dict[str, Any]:
+        """Get order details"""
+        params = {"exchange": exchange, "customer_id": customerId, "order_id": orderId}
+        return await self._make_request(
+            "GET", self.endpoints["order_details"], params=params
+        )
+
+    async def exchangetrades(
+        self, exchange: str, customerId: str, orderId: str
+    ) -> List[Dict[str, Any]]:
+        """Get trades generated by an order"""
+        params = {"exchange": exchange, "customer_id": customerId, "order_id": orderId}
+        result = await self._make_request(
+            "GET", self.endpoints["order_trades"], params=params
+        )
+        trades: List[Dict[str, Any]] = result.get("trades", [])
+        return trades
+
+    async def portfolio_snapshot(self, customerId: str) -> Dict[str, Any]:
+        """Fetch holdings, positions, orders and trades concurrently"""
+        holdings, positions, orders, trades = await asyncio.gather(
+            self.holdings(customerId),
+            self.positions(customerId),
+            self.orders(customerId),
+            self.trades(customerId),
+        )
+        return {
+            "holdings": holdings,
+            "positions": positions,
+            "orders": orders,
+            "trades": trades,
+        }
+
+    # Market Data Operations
+    async def historicaldata(
+        self, exchange: str, scripcode: str, interval: str
+    ) -> List[Dict[str, Any]]:
+        """Get historical market data"""
+        params = {"exchange": exchange, "scripcode": scripcode, "interval": interval}
+        result = await self._make_request(
+            "GET", self.endpoints["history"], params=params
+        )
+        data: List[Dict[str, Any]] = result.get("data", [])
+        return data
+
+    async def quote(self, exchange: str, scrip_code: str) -> Dict[str, Any]:
+        """Get market quote"""
+        params = {"exchange": exchange, "scrip_code": scrip_code}
+        return await self._make_request("GET", self.endpoints["quote"], params=params)
+
+    async def master(self, exchange: str) -> List[Dict[str, Any]]:
+        """Get script master data"""
+        params = {"exchange": exchange}
+        result = await self._make_request(
+            "GET", self.endpoints["master"], params=params
+        )
+        master: List[Dict[str, Any]] = result.get("master", [])
+        return master
+
+    # Order Book Operations
+    async def orders(self, customer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get order book"""
+        params = {}
+        if customer_id:
+            params["customer_id"] = customer_id
+        result = await self._make_request(
+            "GET", self.endpoints["orders"], params=params
+        )
+        orders: List[Dict[str, Any]] = result.get("orders", [])
+        return orders
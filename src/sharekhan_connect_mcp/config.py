@@ -2,16 +2,23 @@
 Configuration settings for Sharekhan MCP Server
 """
 
-import os
+from functools import lru_cache
 from typing import Optional, Union
 
-from pydantic import Field, validator
-from pydantic_settings import BaseSettings
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings"""
 
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        frozen=True,
+    )
+
     # Sharekhan API Configuration (Required)
     sharekhan_api_key: str = Field(..., description="Your Sharekhan API Key")
     sharekhan_secret_key: str = Field(
@@ -61,7 +68,8 @@ class Settings(BaseSettings):
         description="Maximum reconnection attempts",
     )
 
-    @validator("sharekhan_version_id")
+    @field_validator("sharekhan_version_id", mode="before")
+    @classmethod
     def validate_version_id(cls, v: Union[str, int, None]) -> Union[str, None]:
         """Validate version ID is one of the allowed values"""
         if v is None or v == "null":
@@ -70,14 +78,16 @@ class Settings(BaseSettings):
             return str(v)
         raise ValueError("SHAREKHAN_VERSION_ID must be null, 1005, or 1006")
 
-    @validator("sharekhan_customer_id")
+    @field_validator("sharekhan_customer_id", mode="before")
+    @classmethod
     def validate_customer_id(cls, v: str) -> str:
         """Validate customer ID is numeric"""
         if not str(v).isdigit():
             raise ValueError("SHAREKHAN_CUSTOMER_ID must be numeric")
         return str(v)
 
-    @validator("sharekhan_api_key", "sharekhan_secret_key")
+    @field_validator("sharekhan_api_key", "sharekhan_secret_key")
+    @classmethod
     def validate_required_fields(cls, v: str) -> str:
         """Validate required fields are not empty"""
         if not v or v.strip() == "":
@@ -127,7 +137,8 @@ class Settings(BaseSettings):
             "state": self.sharekhan_state,
         }
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsing the environment only once"""
+    return Settings()  # type: ignore
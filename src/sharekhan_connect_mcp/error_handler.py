@@ -3,10 +3,11 @@ Error Handler Module
 Centralized error handling for Sharekhan MCP Server
 """
 
+import re
 import traceback
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import AbstractSet, Any, Dict, Optional, Sequence, Union
 
 from loguru import logger
 
@@ -25,9 +26,16 @@ class ErrorType(Enum):
     UNKNOWN = "unknown"
 
 
+# Plain string values, so responses avoid the Enum.value descriptor per error
+_ERROR_TYPE_VALUE = {t: t.value for t in ErrorType}
+_UNKNOWN_VALUE = ErrorType.UNKNOWN.value
+
+
 class SharekhanError(Exception):
     """Base class for Sharekhan MCP errors"""
 
+    __slots__ = ("message", "error_type", "error_code", "details", "_timestamp")
+
     def __init__(
         self,
         message: str,
@@ -39,13 +47,22 @@ class SharekhanError(Exception):
         self.error_type = error_type
         self.error_code = error_code
         self.details = details or {}
-        self.timestamp = datetime.now()
+        self._timestamp: Optional[datetime] = None
         super().__init__(self.message)
 
+    @property
+    def timestamp(self) -> datetime:
+        """Time the error was first reported, captured on first access"""
+        if self._timestamp is None:
+            self._timestamp = datetime.now()
+        return self._timestamp
+
 
 class AuthenticationError(SharekhanError):
     """Authentication related errors"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(
             message=message,
@@ -58,6 +75,8 @@ class AuthenticationError(SharekhanError):
 class AuthorizationError(SharekhanError):
     """Authorization related errors"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(
             message=message,
@@ -70,6 +89,8 @@ class AuthorizationError(SharekhanError):
 class ValidationError(SharekhanError):
     """Input validation errors"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(
             message=message,
@@ -82,6 +103,8 @@ class ValidationError(SharekhanError):
 class APIError(SharekhanError):
     """Sharekhan API errors"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str,
@@ -99,6 +122,8 @@ class APIError(SharekhanError):
 class RateLimitError(SharekhanError):
     """Rate limiting errors"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str,
@@ -121,6 +146,8 @@ class RateLimitError(SharekhanError):
 class NetworkError(SharekhanError):
     """Network related errors"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(
             message=message,
@@ -133,6 +160,8 @@ class NetworkError(SharekhanError):
 class WebSocketError(SharekhanError):
     """WebSocket related errors"""
 
+    __slots__ = ()
+
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(
             message=message,
@@ -142,168 +171,195 @@ class WebSocketError(SharekhanError):
         )
 
 
+# Error category by HTTP status, with a single-pass keyword fallback for
+# responses that carry no status code
+_STATUS_ERROR_KIND = {401: "unauthorized", 403: "forbidden", 429: "rate limit"}
+_ERROR_KIND_PATTERN = re.compile(r"unauthorized|forbidden|rate limit")
+
+# Message prefix for transport failures wrapped as NetworkError, looked up
+# along the exception's MRO so subclasses like ConnectionResetError match
+_NETWORK_ERROR_PREFIX = {
+    ConnectionError: "Network connection failed: ",
+    TimeoutError: "Request timed out: ",
+}
+
+
+def handle_exception(exc: Exception, context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Handle exceptions and return standardized error response
+
+    Args:
+        exc: The exception to handle
+        context: Optional context where the error occurred
+
+    Returns:
+        Standardized error response dictionary
+    """
+    now = datetime.now()
+    error_id = (
+        f"ERR_{now.year:04d}{now.month:02d}{now.day:02d}_"
+        f"{now.hour:02d}{now.minute:02d}{now.second:02d}_{id(exc)}"
+    )
+
+    # Log the error
+    logger.error("Error ID: {}, Context: {}, Exception: {}", error_id, context, exc)
+    # Only walk and format the stack if a sink actually accepts DEBUG
+    logger.opt(lazy=True).debug("Full traceback: {}", traceback.format_exc)
+
+    # Determine error type and create response
+    if isinstance(exc, SharekhanError):
+        error_response = {
+            "status": "error",
+            "error_id": error_id,
+            "error_type": _ERROR_TYPE_VALUE[exc.error_type],
+            "error_code": exc.error_code,
+            "message": exc.message,
+            "details": exc.details,
+            "timestamp": exc.timestamp.isoformat(),
+            "context": context,
+        }
+    else:
+        error_response = {
+            "status": "error",
+            "error_id": error_id,
+            "error_type": _UNKNOWN_VALUE,
+            "error_code": "UNKNOWN_ERROR",
+            "message": "An unexpected error occurred",
+            "details": {
+                "original_error": str(exc),
+                "exception_type": type(exc).__name__,
+            },
+            "timestamp": now.isoformat(),
+            "context": context,
+        }
+
+    return error_response
+
+
+def create_sharekhan_error(
+    response_data: Dict[str, Any], context: Optional[str] = None
+) -> SharekhanError:
+    """
+    Create SharekhanError from API response
+
+    Args:
+        response_data: API response data
+        context: Optional context
+
+    Returns:
+        SharekhanError instance
+    """
+    message = response_data.get("message", "Unknown API error")
+    error_code = response_data.get("error_code")
+
+    # Determine error type based on status code or error code
+    status_code = response_data.get("status_code")
+    details = {"response": response_data, "context": context}
+
+    kind = _STATUS_ERROR_KIND.get(status_code)  # type: ignore[arg-type]
+    if kind is None:
+        match = _ERROR_KIND_PATTERN.search(message.lower())
+        kind = match.group(0) if match else None
+
+    if kind == "unauthorized":
+        return AuthenticationError(message, details)
+    if kind == "forbidden":
+        return AuthorizationError(message, details)
+    if kind == "rate limit":
+        return RateLimitError(message, response_data.get("retry_after"), details)
+    return APIError(message, error_code, details)
+
+
+def validate_input(
+    data: Dict[str, Any],
+    required_fields: Union[Sequence[str], AbstractSet[str]],
+    context: str = "validation",
+) -> None:
+    """
+    Validate input data against required fields
+
+    Args:
+        data: Input data to validate
+        required_fields: Required field names; callers validating the same
+            fields repeatedly can pass a prebuilt frozenset
+        context: Context for validation
+
+    Raises:
+        ValidationError: If validation fails
+    """
+    required = (
+        required_fields
+        if isinstance(required_fields, AbstractSet)
+        else frozenset(required_fields)
+    )
+    keys = data.keys()
+    missing = required - keys
+    invalid = {f for f in required & keys if data[f] is None or data[f] == ""}
+
+    if missing or invalid:
+        # Report in the caller's field order when it has one
+        ordered = (
+            sorted(required)
+            if isinstance(required_fields, AbstractSet)
+            else required_fields
+        )
+        missing_fields = [f for f in ordered if f in missing]
+        invalid_fields = [f for f in ordered if f in invalid]
+        missing_text = (
+            f". Missing fields: {', '.join(missing_fields)}" if missing_fields else ""
+        )
+        invalid_text = (
+            f". Invalid fields: {', '.join(invalid_fields)}" if invalid_fields else ""
+        )
+
+        error_details = {
+            "missing_fields": missing_fields,
+            "invalid_fields": invalid_fields,
+            "provided_fields": list(keys),
+        }
+        error_message = f"Validation failed{missing_text}{invalid_text}"
+
+        raise ValidationError(error_message, error_details)
+
+
+def wrap_api_call(
+    func: Any, *args: Any, context: Optional[str] = None, **kwargs: Any
+) -> Any:
+    """
+    Wrap API calls with error handling
+
+    Args:
+        func: Function to call
+        *args: Function arguments
+        context: Optional context
+        **kwargs: Function keyword arguments
+
+    Returns:
+        Function result or error response
+    """
+    try:
+        return func(*args, **kwargs)
+    except SharekhanError:
+        # Re-raise Sharekhan errors as-is
+        raise
+    except (ConnectionError, TimeoutError) as e:
+        prefix = next(
+            _NETWORK_ERROR_PREFIX[cls]
+            for cls in type(e).__mro__
+            if cls in _NETWORK_ERROR_PREFIX
+        )
+        raise NetworkError(prefix + str(e), {"context": context})
+    except Exception as e:
+        raise APIError(
+            f"Unexpected API error: {str(e)}",
+            details={"context": context, "exception_type": type(e).__name__},
+        )
+
+
 class ErrorHandler:
-    """Centralized error handler"""
-
-    @staticmethod
-    def handle_exception(
-        exc: Exception, context: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Handle exceptions and return standardized error response
-
-        Args:
-            exc: The exception to handle
-            context: Optional context where the error occurred
-
-        Returns:
-            Standardized error response dictionary
-        """
-        error_id = f"ERR_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(exc)}"
-
-        # Log the error
-        logger.error(f"Error ID: {error_id}, Context: {context}, Exception: {str(exc)}")
-        logger.debug(f"Full traceback: {traceback.format_exc()}")
-
-        # Determine error type and create response
-        if isinstance(exc, SharekhanError):
-            error_response = {
-                "status": "error",
-                "error_id": error_id,
-                "error_type": exc.error_type.value,
-                "error_code": exc.error_code,
-                "message": exc.message,
-                "details": exc.details,
-                "timestamp": exc.timestamp.isoformat(),
-                "context": context,
-            }
-        else:
-            error_response = {
-                "status": "error",
-                "error_id": error_id,
-                "error_type": ErrorType.UNKNOWN.value,
-                "error_code": "UNKNOWN_ERROR",
-                "message": "An unexpected error occurred",
-                "details": {
-                    "original_error": str(exc),
-                    "exception_type": type(exc).__name__,
-                },
-                "timestamp": datetime.now().isoformat(),
-                "context": context,
-            }
-
-        return error_response
-
-    @staticmethod
-    def create_sharekhan_error(
-        response_data: Dict[str, Any], context: Optional[str] = None
-    ) -> SharekhanError:
-        """
-        Create SharekhanError from API response
-
-        Args:
-            response_data: API response data
-            context: Optional context
-
-        Returns:
-            SharekhanError instance
-        """
-        message = response_data.get("message", "Unknown API error")
-        error_code = response_data.get("error_code")
-
-        # Determine error type based on status code or error code
-        status_code = response_data.get("status_code")
-
-        if status_code == 401 or "unauthorized" in message.lower():
-            return AuthenticationError(
-                message, {"response": response_data, "context": context}
-            )
-        elif status_code == 403 or "forbidden" in message.lower():
-            return AuthorizationError(
-                message, {"response": response_data, "context": context}
-            )
-        elif status_code == 429 or "rate limit" in message.lower():
-            retry_after = response_data.get("retry_after")
-            return RateLimitError(
-                message, retry_after, {"response": response_data, "context": context}
-            )
-        elif status_code and status_code >= 500:
-            return APIError(
-                message, error_code, {"response": response_data, "context": context}
-            )
-        else:
-            return APIError(
-                message, error_code, {"response": response_data, "context": context}
-            )
-
-    @staticmethod
-    def validate_input(
-        data: Dict[str, Any], required_fields: list, context: str = "validation"
-    ) -> None:
-        """
-        Validate input data against required fields
-
-        Args:
-            data: Input data to validate
-            required_fields: List of required field names
-            context: Context for validation
-
-        Raises:
-            ValidationError: If validation fails
-        """
-        missing_fields = []
-        invalid_fields = []
-
-        for field in required_fields:
-            if field not in data:
-                missing_fields.append(field)
-            elif data[field] is None or data[field] == "":
-                invalid_fields.append(field)
-
-        if missing_fields or invalid_fields:
-            error_details = {
-                "missing_fields": missing_fields,
-                "invalid_fields": invalid_fields,
-                "provided_fields": list(data.keys()),
-            }
-
-            error_message = "Validation failed"
-            if missing_fields:
-                error_message += f". Missing fields: {', '.join(missing_fields)}"
-            if invalid_fields:
-                error_message += f". Invalid fields: {', '.join(invalid_fields)}"
-
-            raise ValidationError(error_message, error_details)
-
-    @staticmethod
-    def wrap_api_call(
-        func: Any, *args: Any, context: Optional[str] = None, **kwargs: Any
-    ) -> Any:
-        """
-        Wrap API calls with error handling
-
-        Args:
-            func: Function to call
-            *args: Function arguments
-            context: Optional context
-            **kwargs: Function keyword arguments
-
-        Returns:
-            Function result or error response
-        """
-        try:
-            return func(*args, **kwargs)
-        except SharekhanError:
-            # Re-raise Sharekhan errors as-is
-            raise
-        except ConnectionError as e:
-            raise NetworkError(
-                f"Network connection failed: {str(e)}", {"context": context}
-            )
-        except TimeoutError as e:
-            raise NetworkError(f"Request timed out: {str(e)}", {"context": context})
-        except Exception as e:
-            raise APIError(
-                f"Unexpected API error: {str(e)}",
-                details={"context": context, "exception_type": type(e).__name__},
-            )
+    """Centralized error handler, kept as a namespace for the functions above"""
+
+    handle_exception = staticmethod(handle_exception)
+    create_sharekhan_error = staticmethod(create_sharekhan_error)
+    validate_input = staticmethod(validate_input)
+    wrap_api_call = staticmethod(wrap_api_call)
@@ -2,7 +2,11 @@
 Logging configuration for Sharekhan MCP Server
 """
 
+import os
 import sys
+import time
+import zipfile
+from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -14,9 +18,94 @@ if TYPE_CHECKING:
     from loguru import Logger
 
 
+# Loguru compiles static format strings once when the sink is added
+CONSOLE_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+FILE_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+)
+
+
+class RotatingFileSink:
+    """
+    Append-only file sink with size based rotation
+
+    The current size is tracked in memory from the bytes written, so the
+    rotation check is an int compare rather than a seek per message.
+    Rotated files are zipped and archives older than the retention period
+    are removed at rotation time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        retention_seconds: float = 30 * 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self._open()
+
+    def _open(self) -> None:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0)
+        self._fd = os.open(self.path, flags, 0o644)
+        self._size = os.fstat(self._fd).st_size
+
+    def write(self, message: str) -> None:
+        data = message.encode("utf-8")
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        os.write(self._fd, data)
+        self._size += len(data)
+
+    def stop(self) -> None:
+        os.close(self._fd)
+
+    def _rotate(self) -> None:
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        try:
+            # Renaming under the open fd keeps it valid if anything below fails
+            os.replace(self.path, rotated)
+        except OSError as e:
+            # Live file removed or locked: start a fresh one and keep writing
+            sys.stderr.write(f"Log rotation failed for {self.path}: {e}\n")
+        else:
+            self._archive(rotated)
+        finally:
+            old_fd = self._fd
+            self._open()
+            os.close(old_fd)
+
+        cutoff = time.time() - self.retention_seconds
+        for old in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}.zip"):
+            try:
+                if old.stat().st_mtime < cutoff:
+                    old.unlink()
+            except OSError:
+                pass
+
+    def _archive(self, rotated: Path) -> None:
+        archive = rotated.with_name(rotated.name + ".zip")
+        try:
+            with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                zf.write(rotated, rotated.name)
+            rotated.unlink()
+        except OSError as e:
+            # Keep the plain rotated file rather than lose its contents
+            sys.stderr.write(f"Log archiving failed for {rotated}: {e}\n")
+            try:
+                archive.unlink()
+            except OSError:
+                pass
+
+
 def setup_logging(settings: Settings) -> "Logger":
     """Setup structured logging with loguru"""
 
+    # Sinks use enqueue=True so callers only pay for a queue put; a loguru
+    # worker thread does the formatting and the write syscalls
+
     # Remove default handler
     logger.remove()
 
@@ -28,19 +117,18 @@ def setup_logging(settings: Settings) -> "Logger":
     logger.add(
         sys.stdout,
         level=settings.log_level,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        colorize=True,
+        format=CONSOLE_FORMAT,
+        colorize=sys.stdout.isatty(),
+        enqueue=True,
     )
 
     # File handler for persistent logs
     logger.add(
-        settings.log_file,
+        RotatingFileSink(settings.log_file),  # 10 MB rotation, 30 days, zipped
         level=settings.log_level,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        rotation="10 MB",
-        retention="30 days",
-        compression="zip",
+        format=FILE_FORMAT,
         serialize=False,  # Set to True for JSON structured logging
+        enqueue=True,
     )
 
     return logger
@@ -4,17 +4,24 @@ Performance and health monitoring for Sharekhan MCP Server
 """
 
 import asyncio
+import sys
 import time
-from collections import defaultdict, deque
-from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
-from typing import Any, Deque, Dict, List, Optional
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
 
 import psutil
 from loguru import logger
 
+# Slotted dataclasses (3.10+) drop the per-instance __dict__ for the records
+# kept in the history deques
+_DATACLASS_SLOTS: Dict[str, bool] = (
+    {"slots": True} if sys.version_info >= (3, 10) else {}
+)
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class RequestMetrics:
     """Request metrics data class"""
 
@@ -25,9 +32,14 @@ class RequestMetrics:
     timestamp: datetime
     user_id: Optional[str] = None
     tool_name: Optional[str] = None
+    ts: float = field(default_factory=time.monotonic, repr=False)
+    timestamp_iso: str = field(init=False, repr=False)
 
+    def __post_init__(self) -> None:
+        self.timestamp_iso = self.timestamp.isoformat()
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class SystemMetrics:
     """System metrics data class"""
 
@@ -38,9 +50,14 @@ class SystemMetrics:
     disk_usage_percent: float
     active_connections: int
     uptime_seconds: float
+    ts: float = field(default_factory=time.monotonic, repr=False)
+    timestamp_iso: str = field(init=False, repr=False)
 
+    def __post_init__(self) -> None:
+        self.timestamp_iso = self.timestamp.isoformat()
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class APIHealthMetrics:
     """API health metrics"""
 
@@ -50,19 +67,98 @@ class APIHealthMetrics:
     last_check: datetime
     consecutive_failures: int
     error_details: Optional[str] = None
+    ts: float = field(default_factory=time.monotonic, repr=False)
+    last_check_iso: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.last_check_iso = self.last_check.isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat, JSON-ready view of the health record"""
+        return {
+            "api_endpoint": self.api_endpoint,
+            "status": self.status,
+            "response_time": self.response_time,
+            "last_check": self.last_check_iso,
+            "consecutive_failures": self.consecutive_failures,
+            "error_details": self.error_details,
+        }
+
+
+@dataclass
+class ResponseTimeStats:
+    """Running response time aggregates, updated in O(1) per request"""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+
+    def record(self, response_time: float) -> None:
+        """Fold one response time into the aggregates"""
+        if self.count == 0 or response_time < self.min:
+            self.min = response_time
+        if response_time > self.max:
+            self.max = response_time
+        self.count += 1
+        self.total += response_time
+
+    def merge(self, other: "ResponseTimeStats") -> None:
+        """Fold another set of aggregates into this one"""
+        if other.count == 0:
+            return
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def average(self) -> float:
+        """Mean response time, or 0 when nothing has been recorded"""
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class MinuteBucket:
+    """Request and error counters for one minute of monotonic time"""
+
+    minute: int
+    requests: int = 0
+    successes: int = 0
+    response_time: ResponseTimeStats = field(default_factory=ResponseTimeStats)
+    errors: "Counter[str]" = field(default_factory=Counter)
 
 
 class MetricsCollector:
     """Collects and stores metrics"""
 
-    def __init__(self, max_history_size: int = 10000):
+    # Disk usage changes slowly, so it is only re-read every N samples; the
+    # connection table scan is refreshed at most once per interval
+    DISK_SAMPLE_EVERY = 10
+    CONNECTIONS_TTL = 60.0
+
+    def __init__(
+        self,
+        max_history_size: int = 10000,
+        bucket_minutes: int = 60,
+        collect_connections: bool = True,
+    ):
         self.max_history_size = max_history_size
         self.start_time = datetime.now()
+        self._start_ts = time.monotonic()
+
+        # Per-minute counters backing get_summary_metrics; windows longer than
+        # bucket_minutes only see the retained minutes
+        self._buckets: Deque[MinuteBucket] = deque(maxlen=bucket_minutes)
 
         # Request metrics
         self.request_history: Deque[RequestMetrics] = deque(maxlen=max_history_size)
         self.request_counts: Dict[str, int] = defaultdict(int)
-        self.response_times: Dict[str, List[float]] = defaultdict(list)
+        self.response_times: Dict[str, ResponseTimeStats] = defaultdict(
+            ResponseTimeStats
+        )
 
         # Error tracking
         self.error_counts: Dict[str, int] = defaultdict(int)
@@ -71,58 +167,108 @@ class MetricsCollector:
         # System metrics
         self.system_metrics_history: Deque[SystemMetrics] = deque(maxlen=1000)
 
+        # Cached psutil readings for record_system_metrics
+        self.collect_connections = collect_connections
+        self._system_samples = 0
+        self._disk_percent = 0.0
+        self._connections = 0
+        self._connections_ts: Optional[float] = None
+        # cpu_percent(interval=None) reports usage since the previous call,
+        # so prime it here to make the first sample meaningful
+        psutil.cpu_percent(interval=None)
+
         # API health metrics
         self.api_health: Dict[str, APIHealthMetrics] = {}
 
         # Tool usage metrics
         self.tool_usage_counts: Dict[str, int] = defaultdict(int)
-        self.tool_response_times: Dict[str, List[float]] = defaultdict(list)
+        self.tool_response_times: Dict[str, ResponseTimeStats] = defaultdict(
+            ResponseTimeStats
+        )
+
+    def _bucket_at(self, ts: float) -> MinuteBucket:
+        """Return the bucket for the minute containing ts, rotating in a new one"""
+        minute = int(ts // 60)
+        buckets = self._buckets
+        if not buckets or minute > buckets[-1].minute:
+            buckets.append(MinuteBucket(minute))
+            return buckets[-1]
+
+        # A metric stamped earlier but recorded late: reuse its minute's bucket,
+        # or fold it into the nearest newer one, so buckets stay in order
+        target = buckets[-1]
+        for bucket in reversed(buckets):
+            if bucket.minute < minute:
+                break
+            target = bucket
+        return target
 
     def record_request(self, metrics: RequestMetrics) -> None:
         """Record request metrics"""
         self.request_history.append(metrics)
 
+        bucket = self._bucket_at(metrics.ts)
+        bucket.requests += 1
+        if 200 <= metrics.status_code < 400:
+            bucket.successes += 1
+        bucket.response_time.record(metrics.response_time)
+
         # Update counters
         endpoint_key = f"{metrics.method} {metrics.endpoint}"
         self.request_counts[endpoint_key] += 1
-        self.response_times[endpoint_key].append(metrics.response_time)
+        self.response_times[endpoint_key].record(metrics.response_time)
 
         # Record tool usage if applicable
         if metrics.tool_name:
             self.tool_usage_counts[metrics.tool_name] += 1
-            self.tool_response_times[metrics.tool_name].append(metrics.response_time)
+            self.tool_response_times[metrics.tool_name].record(metrics.response_time)
 
     def record_error(self, error_type: str, error_details: Dict[str, Any]) -> None:
         """Record error metrics"""
+        now = datetime.now()
+        ts = time.monotonic()
         self.error_counts[error_type] += 1
+        self._bucket_at(ts).errors[error_type] += 1
         self.error_history.append(
             {
                 "error_type": error_type,
                 "details": error_details,
-                "timestamp": datetime.now(),
+                "timestamp": now,
+                "timestamp_iso": now.isoformat(),
+                "ts": ts,
             }
         )
 
     def record_system_metrics(self) -> None:
-        """Record current system metrics"""
-        cpu_percent = psutil.cpu_percent(interval=1)
+        """Record current system metrics without blocking on CPU sampling"""
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
 
-        # Get network connections count (approximation)
-        try:
-            connections = len(psutil.net_connections())
-        except:
-            connections = 0
+        if self._system_samples % self.DISK_SAMPLE_EVERY == 0:
+            self._disk_percent = psutil.disk_usage("/").percent
+        self._system_samples += 1
+
+        now_ts = time.monotonic()
+        if self.collect_connections and (
+            self._connections_ts is None
+            or now_ts - self._connections_ts >= self.CONNECTIONS_TTL
+        ):
+            # Get network connections count (approximation)
+            try:
+                self._connections = len(psutil.net_connections())
+            except (psutil.Error, OSError):
+                self._connections = 0
+            self._connections_ts = now_ts
 
         metrics = SystemMetrics(
             timestamp=datetime.now(),
             cpu_percent=cpu_percent,
             memory_percent=memory.percent,
             memory_used_mb=memory.used / 1024 / 1024,
-            disk_usage_percent=disk.percent,
-            active_connections=connections,
-            uptime_seconds=(datetime.now() - self.start_time).total_seconds(),
+            disk_usage_percent=self._disk_percent,
+            active_connections=self._connections,
+            uptime_seconds=now_ts - self._start_ts,
+            ts=now_ts,
         )
 
         self.system_metrics_history.append(metrics)
@@ -164,44 +310,42 @@ class MetricsCollector:
 
     def get_summary_metrics(self, time_window_minutes: int = 5) -> Dict[str, Any]:
         """Get summary metrics for the specified time window"""
-        cutoff_time = datetime.now() - timedelta(minutes=time_window_minutes)
-
-        # Filter recent requests
-        recent_requests = [
-            r for r in self.request_history if r.timestamp >= cutoff_time
-        ]
+        now_iso = datetime.now().isoformat()
+        now_ts = time.monotonic()
+        cutoff_ts = now_ts - time_window_minutes * 60
+        first_minute = int(now_ts // 60) - time_window_minutes + 1
+
+        # Sum the per-minute buckets inside the window, newest first
+        total_requests = 0
+        successful_requests = 0
+        response_times = ResponseTimeStats()
+        error_by_type: "Counter[str]" = Counter()
+        for bucket in reversed(self._buckets):
+            if bucket.minute < first_minute:
+                break
+            total_requests += bucket.requests
+            successful_requests += bucket.successes
+            response_times.merge(bucket.response_time)
+            error_by_type.update(bucket.errors)
 
-        # Calculate request statistics
-        total_requests = len(recent_requests)
-        successful_requests = len(
-            [r for r in recent_requests if 200 <= r.status_code < 400]
-        )
         error_requests = total_requests - successful_requests
-
-        # Calculate response time statistics
-        response_times = [r.response_time for r in recent_requests]
-        avg_response_time = (
-            sum(response_times) / len(response_times) if response_times else 0
+        total_errors = sum(error_by_type.values())
+        avg_response_time = response_times.average
+        max_response_time = response_times.max
+        min_response_time = response_times.min
+
+        # Latest system sample, if it falls inside the window
+        latest_system = (
+            self.system_metrics_history[-1]
+            if self.system_metrics_history
+            and self.system_metrics_history[-1].ts >= cutoff_ts
+            else None
         )
-        max_response_time = max(response_times) if response_times else 0
-        min_response_time = min(response_times) if response_times else 0
-
-        # Get system metrics
-        recent_system_metrics = [
-            m for m in self.system_metrics_history if m.timestamp >= cutoff_time
-        ]
-        latest_system = recent_system_metrics[-1] if recent_system_metrics else None
-
-        # Calculate error statistics
-        recent_errors = [e for e in self.error_history if e["timestamp"] >= cutoff_time]
-        error_by_type: Dict[str, int] = defaultdict(int)
-        for error in recent_errors:
-            error_by_type[error["error_type"]] += 1
 
         return {
             "time_window_minutes": time_window_minutes,
-            "timestamp": datetime.now().isoformat(),
-            "uptime_seconds": (datetime.now() - self.start_time).total_seconds(),
+            "timestamp": now_iso,
+            "uptime_seconds": now_ts - self._start_ts,
             "request_metrics": {
                 "total_requests": total_requests,
                 "successful_requests": successful_requests,
@@ -219,6 +363,7 @@ class MetricsCollector:
                 "min_response_time_ms": min_response_time * 1000,
             },
             "system_metrics": {
+                "timestamp": latest_system.timestamp_iso if latest_system else None,
                 "cpu_percent": latest_system.cpu_percent if latest_system else 0,
                 "memory_percent": latest_system.memory_percent if latest_system else 0,
                 "memory_used_mb": latest_system.memory_used_mb if latest_system else 0,
@@ -230,15 +375,16 @@ class MetricsCollector:
                 ),
             },
             "error_metrics": {
-                "total_errors": len(recent_errors),
+                "total_errors": total_errors,
                 "error_rate": (
-                    len(recent_errors) / total_requests if total_requests > 0 else 0
+                    total_errors / total_requests if total_requests > 0 else 0
                 ),
                 "errors_by_type": dict(error_by_type),
             },
             "tool_usage": dict(self.tool_usage_counts),
             "api_health": {
-                endpoint: asdict(health) for endpoint, health in self.api_health.items()
+                endpoint: health.to_dict()
+                for endpoint, health in self.api_health.items()
             },
         }
 
@@ -246,8 +392,10 @@ class MetricsCollector:
 class MonitoringService:
     """Main monitoring service"""
 
-    def __init__(self, max_history_size: int = 10000):
-        self.metrics_collector = MetricsCollector(max_history_size)
+    def __init__(self, max_history_size: int = 10000, collect_connections: bool = True):
+        self.metrics_collector = MetricsCollector(
+            max_history_size, collect_connections=collect_connections
+        )
         self.system_monitor_task: Optional[asyncio.Task] = None
 
     async def start(self) -> None:
@@ -318,7 +466,7 @@ class MonitoringService:
 
         return {
             "status": overall_health,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": summary["timestamp"],
             "uptime_seconds": summary["uptime_seconds"],
             "issues": issues,
             "summary": summary,
@@ -6,16 +6,21 @@ Main MCP server implementation with authentication and session handling
 import asyncio
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Optional, cast
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Sequence, Union
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
+from pydantic import ValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .client import SharekhanClient
-from .config import Settings
+from .config import Settings, get_settings
 from .logger import setup_logging
 from .session import SharekhanSessionManager
 from .tools import SharekhanMCPTools
@@ -34,54 +39,126 @@ class MCPServer:
         self.tools: List[Tool] = []
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Application lifespan manager"""
-    logger.info("Starting Sharekhan MCP Server...")
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
 
-    # Initialize components
-    settings = app.state.settings
-    client = SharekhanClient(
-        api_key=settings.sharekhan_api_key,
-        secret_key=settings.sharekhan_secret_key,
-        vendor_key=settings.sharekhan_vendor_key,
-    )
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-    session_manager = SharekhanSessionManager(
-        client,
-        customer_id=settings.sharekhan_customer_id,
-        version_id=(
-            str(settings.sharekhan_version_id)
-            if settings.sharekhan_version_id is not None
-            else "1005"
+# Invariant response bodies, encoded once at import
+_ROOT_BODY = orjson.dumps(
+    {"message": "Sharekhan MCP Server", "version": "1.0.0", "status": "running"}
+)
+_NOT_READY_BODY = orjson.dumps(
+    {"status": "unhealthy", "message": "Components not initialized"}
+)
+
+
+def ndjson_chunks(rows: Sequence[Any], batch_size: int = 256) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, a batch of rows per chunk"""
+    dumps = orjson.dumps
+    option = orjson.OPT_APPEND_NEWLINE
+    for start in range(0, len(rows), batch_size):
+        yield b"".join(
+            dumps(row, option=option) for row in rows[start : start + batch_size]
+        )
+
+
+class StaticCORSMiddleware:
+    """
+    Allow-all CORS (any origin, method and header, with credentials) as a
+    plain ASGI middleware with precomputed headers. Requests without an
+    Origin header pass straight through.
+    """
+
+    _CORS_HEADERS = [
+        (b"access-control-allow-credentials", b"true"),
+        (b"vary", b"Origin"),
+    ]
+    _PREFLIGHT_HEADERS = _CORS_HEADERS + [
+        (
+            b"access-control-allow-methods",
+            b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT",
         ),
-        state=settings.sharekhan_state,
-    )
-    tools = SharekhanMCPTools(client, session_manager)
+        (b"access-control-max-age", b"600"),
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", b"2"),
+    ]
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        origin = request_headers.get(b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allow_origin = (b"access-control-allow-origin", origin)
+
+        # Answer preflight requests here instead of routing them
+        if (
+            scope["method"] == "OPTIONS"
+            and b"access-control-request-method" in request_headers
+        ):
+            headers = [allow_origin, *self._PREFLIGHT_HEADERS]
+            requested = request_headers.get(b"access-control-request-headers")
+            if requested:
+                headers.append((b"access-control-allow-headers", requested))
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    allow_origin,
+                    *self._CORS_HEADERS,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
 
-    # Initialize WebSocket client (will be connected after authentication)
-    ws_client = SharekhanWebSocketClient(access_token="")  # nosec: B106
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """Application lifespan manager"""
+    logger.info("Starting Sharekhan MCP Server...")
 
-    # Store in app state
-    app.state.client = client
-    app.state.session_manager = session_manager
-    app.state.tools = tools
-    app.state.ws_client = ws_client
+    # Components are built with the server; the app only serves once ready
+    app.state.ready = True
 
     logger.info("Sharekhan MCP Server initialized")
 
     yield
 
     logger.info("Shutting down Sharekhan MCP Server...")
-    if session_manager:
-        session_manager.logout()
+    app.state.ready = False
+    client: SharekhanClient = app.state.client
+    tools: SharekhanMCPTools = app.state.tools
+    ws_client: SharekhanWebSocketClient = app.state.ws_client
+    app.state.session_manager.logout()
 
-    # Disconnect WebSocket
-    app_ws_client: Optional[SharekhanWebSocketClient] = getattr(
-        app.state, "ws_client", None
-    )
-    if app_ws_client and hasattr(app_ws_client, "disconnect"):
-        await app_ws_client.disconnect()
+    # Close the async HTTP pool and the WebSocket concurrently; shutdown takes
+    # as long as the slower of the two rather than their sum
+    for result in await asyncio.gather(
+        tools.async_client.aclose(), ws_client.disconnect(), return_exceptions=True
+    ):
+        if isinstance(result, Exception):
+            logger.error("Error during shutdown: {}", result)
+
+    client.close()
 
 
 class SharekhanMCPServer:
@@ -94,10 +171,40 @@ class SharekhanMCPServer:
             description="MCP server for Sharekhan trading APIs",
             version="1.0.0",
             lifespan=lifespan,
+            default_response_class=ORJSONResponse,
+        )
+
+        # Initialize components; constructors do no I/O, so failures surface
+        # here rather than on a request
+        self.client = SharekhanClient(
+            api_key=settings.sharekhan_api_key,
+            secret_key=settings.sharekhan_secret_key,
+            vendor_key=settings.sharekhan_vendor_key,
+            max_retries=settings.max_retries,
+            retry_delay=settings.retry_delay,
+        )
+        self.session_manager = SharekhanSessionManager(
+            self.client,
+            customer_id=settings.sharekhan_customer_id,
+            version_id=(
+                str(settings.sharekhan_version_id)
+                if settings.sharekhan_version_id is not None
+                else "1005"
+            ),
+            state=settings.sharekhan_state,
         )
+        self.tools = SharekhanMCPTools(self.client, self.session_manager)
 
-        # Store settings in app state
+        # Initialize WebSocket client (will be connected after authentication)
+        self.ws_client = SharekhanWebSocketClient(access_token="")  # nosec: B106
+
+        # Store in app state for lifespan shutdown
         self.app.state.settings = settings
+        self.app.state.client = self.client
+        self.app.state.session_manager = self.session_manager
+        self.app.state.tools = self.tools
+        self.app.state.ws_client = self.ws_client
+        self.app.state.ready = False
 
         # Setup middleware
         self._setup_middleware()
@@ -107,39 +214,29 @@ class SharekhanMCPServer:
 
     def _setup_middleware(self) -> None:
         """Setup FastAPI middleware"""
-        self.app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+        self.app.add_middleware(StaticCORSMiddleware)
 
     def _setup_routes(self) -> None:
         """Setup API routes"""
+        # Routes close over the components instead of looking them up per request
+        app_state = self.app.state
+        session_manager = self.session_manager
+        tools = self.tools
 
         @self.app.get("/")
-        async def root() -> Dict[str, str]:
+        async def root() -> Response:
             """Root endpoint"""
-            return {
-                "message": "Sharekhan MCP Server",
-                "version": "1.0.0",
-                "status": "running",
-            }
-
-        @self.app.get("/health")
-        async def health_check() -> Dict[str, Any]:
+            return Response(content=_ROOT_BODY, media_type="application/json")
+
+        @self.app.get("/health", response_model=None)
+        async def health_check() -> Union[Dict[str, Any], Response]:
             """Health check endpoint"""
             try:
                 # Check if components are initialized
-                client = getattr(self.app.state, "client", None)
-                session_manager = getattr(self.app.state, "session_manager", None)
-
-                if not client or not session_manager:
-                    return {
-                        "status": "unhealthy",
-                        "message": "Components not initialized",
-                    }
+                if not app_state.ready:
+                    return Response(
+                        content=_NOT_READY_BODY, media_type="application/json"
+                    )
 
                 # Check authentication status
                 is_authenticated = session_manager.is_token_valid()
@@ -147,26 +244,22 @@ class SharekhanMCPServer:
                 return {
                     "status": "healthy",
                     "authenticated": is_authenticated,
-                    "timestamp": asyncio.get_event_loop().time(),
+                    "timestamp": time.monotonic(),
                 }
 
             except Exception as e:
-                logger.error(f"Health check failed: {e}")
+                logger.error("Health check failed: {}", e)
                 raise HTTPException(status_code=503, detail=str(e))
 
         @self.app.get("/auth/login")
         async def get_login_url() -> Dict[str, Any]:
             """Get login URL for authentication"""
             try:
-                tools = getattr(self.app.state, "tools", None)
-                if not tools:
-                    raise HTTPException(status_code=503, detail="Tools not initialized")
-
-                result = await tools.get_login_url()
-                return cast(Dict[str, Any], result)
+                result: Dict[str, Any] = await tools.get_login_url()
+                return result
 
             except Exception as e:
-                logger.error(f"Failed to get login URL: {e}")
+                logger.error("Failed to get login URL: {}", e)
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.post("/auth/callback")
@@ -175,13 +268,9 @@ class SharekhanMCPServer:
         ) -> Dict[str, str]:
             """Handle authentication callback"""
             try:
-                session_manager = getattr(self.app.state, "session_manager", None)
-                if not session_manager:
-                    raise HTTPException(
-                        status_code=503, detail="Session manager not initialized"
-                    )
-
-                success = session_manager.authenticate(request_token, customer_id)
+                success = await session_manager.authenticate_async(
+                    request_token, customer_id
+                )
 
                 if success:
                     return {"status": "success", "message": "Authentication successful"}
@@ -189,66 +278,64 @@ class SharekhanMCPServer:
                     raise HTTPException(status_code=401, detail="Authentication failed")
 
             except Exception as e:
-                logger.error(f"Authentication callback failed: {e}")
+                logger.error("Authentication callback failed: {}", e)
                 raise HTTPException(status_code=500, detail=str(e))
 
+        # The tool set is fixed, so /tools serves bytes serialized once
+        tool_names = list(tools.tool_names)
+        tools_listing = orjson.dumps({"tools": tool_names, "total": len(tool_names)})
+
         @self.app.get("/tools")
-        async def list_tools() -> Dict[str, Any]:
+        async def list_tools() -> Response:
             """List available MCP tools"""
-            try:
-                tools = getattr(self.app.state, "tools", None)
-                if not tools:
-                    raise HTTPException(status_code=503, detail="Tools not initialized")
-
-                # Get all tool methods from the tools class
-                tool_methods = [
-                    method
-                    for method in dir(tools)
-                    if not method.startswith("_")
-                    and hasattr(getattr(tools, method), "__name__")
-                ]
-
-                return {"tools": tool_methods, "total": len(tool_methods)}
+            return Response(content=tools_listing, media_type="application/json")
 
-            except Exception as e:
-                logger.error(f"Failed to list tools: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
-
-        @self.app.post("/tools/{tool_name}")
+        @self.app.post("/tools/{tool_name}", response_model=None)
         async def execute_tool(
-            tool_name: str, request_data: Dict[str, Any]
-        ) -> Dict[str, Any]:
+            tool_name: str, request_data: Dict[str, Any], request: Request
+        ) -> Union[Dict[str, Any], StreamingResponse]:
             """Execute a specific MCP tool"""
             try:
-                tools = getattr(self.app.state, "tools", None)
-                if not tools:
-                    raise HTTPException(status_code=503, detail="Tools not initialized")
-
                 # Get the tool method
-                tool_method = getattr(tools, tool_name, None)
+                tool_method = tools.tool_methods.get(tool_name)
                 if not tool_method:
                     raise HTTPException(
                         status_code=404, detail=f"Tool '{tool_name}' not found"
                     )
 
-                # Execute the tool
-                result = await tool_method(**request_data)
-                return cast(Dict[str, Any], result)
+                # Execute the tool, validating the body into its input model once
+                input_model = tools.tool_input_models[tool_name]
+                result: Dict[str, Any]
+                if input_model is not None:
+                    result = await tool_method(input_model.model_validate(request_data))
+                else:
+                    result = await tool_method(**request_data)
+
+                # Clients asking for NDJSON get list results streamed row by
+                # row; the sync generator is encoded in Starlette's threadpool
+                rows = result.get("data")
+                if (
+                    isinstance(rows, list)
+                    and result.get("status") == "success"
+                    and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+                ):
+                    return StreamingResponse(
+                        ndjson_chunks(rows), media_type=NDJSON_MEDIA_TYPE
+                    )
+                return result
 
+            except ValidationError as e:
+                raise RequestValidationError(e.errors())
+            except HTTPException:
+                raise
             except Exception as e:
-                logger.error(f"Tool execution failed: {e}")
+                logger.error("Tool execution failed: {}", e)
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.get("/auth/status")
         async def auth_status() -> Dict[str, Any]:
             """Get authentication status"""
             try:
-                session_manager = getattr(self.app.state, "session_manager", None)
-                if not session_manager:
-                    raise HTTPException(
-                        status_code=503, detail="Session manager not initialized"
-                    )
-
                 is_authenticated = session_manager.is_token_valid()
 
                 return {
@@ -262,24 +349,18 @@ class SharekhanMCPServer:
                 }
 
             except Exception as e:
-                logger.error(f"Failed to get auth status: {e}")
+                logger.error("Failed to get auth status: {}", e)
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.post("/auth/logout")
         async def logout() -> Dict[str, str]:
             """Logout and clear session"""
             try:
-                session_manager = getattr(self.app.state, "session_manager", None)
-                if not session_manager:
-                    raise HTTPException(
-                        status_code=503, detail="Session manager not initialized"
-                    )
-
                 session_manager.logout()
                 return {"status": "success", "message": "Logged out successfully"}
 
             except Exception as e:
-                logger.error(f"Logout failed: {e}")
+                logger.error("Logout failed: {}", e)
                 raise HTTPException(status_code=500, detail=str(e))
 
     def run(self) -> None:
@@ -287,7 +368,9 @@ class SharekhanMCPServer:
         import uvicorn
 
         logger.info(
-            f"Starting Sharekhan MCP Server on {self.settings.mcp_host}:{self.settings.mcp_port}"
+            "Starting Sharekhan MCP Server on {}:{}",
+            self.settings.mcp_host,
+            self.settings.mcp_port,
         )
 
         uvicorn.run(
@@ -295,7 +378,9 @@ class SharekhanMCPServer:
             host=self.settings.mcp_host,
             port=self.settings.mcp_port,
             log_level=self.settings.log_level.lower(),
-            access_log=True,
+            # Per-request access lines are written on the loop thread, so they
+            # are only emitted when debugging
+            access_log=self.settings.log_level.upper() == "DEBUG",
         )
 
 
@@ -324,7 +409,7 @@ def main() -> None:
 
     # Initialize settings AFTER arg parsing
     try:
-        settings = Settings()  # type: ignore
+        settings = get_settings()
     except Exception as e:
         print(f"Error: Missing required configuration: {e}")
         print("\nRequired environment variables:")
@@ -339,11 +424,14 @@ def main() -> None:
         print("  - MCP_HOST (default: 0.0.0.0)")
         sys.exit(1)
 
-    # Override settings with CLI args if provided
+    # Override settings with CLI args if provided (settings are frozen)
+    overrides: Dict[str, Any] = {}
     if args.port:
-        settings.mcp_port = args.port
+        overrides["mcp_port"] = args.port
     if args.host:
-        settings.mcp_host = args.host
+        overrides["mcp_host"] = args.host
+    if overrides:
+        settings = settings.model_copy(update=overrides)
 
     # Setup logging
     logger = setup_logging(settings)
@@ -354,7 +442,7 @@ def main() -> None:
         server = SharekhanMCPServer(settings)
         server.run()
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: {}", e)
         sys.exit(1)
 
 
@@ -3,9 +3,10 @@ Session Manager for Sharekhan Authentication
 Handles authentication flow and token refresh
 """
 
+import asyncio
 import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 
 from loguru import logger
 
@@ -29,6 +30,10 @@ class SharekhanSessionManager:
         self.token_expiry: Optional[datetime] = None
         self.session_expiry: Optional[datetime] = None
         self.refresh_threshold = timedelta(minutes=30)  # Refresh 30 mins before expiry
+        # Monotonic deadline (expiry minus refresh threshold) for is_token_valid
+        self._valid_until_monotonic: float = 0.0
+        # In-flight authenticate_async attempts by request token
+        self._auth_inflight: Dict[str, "asyncio.Future[bool]"] = {}
 
     def authenticate(
         self, request_token: str, customer_id: Optional[str] = None
@@ -71,8 +76,11 @@ class SharekhanSessionManager:
                 return False
 
             # Set expiry times (typically 24 hours)
-            self.session_expiry = datetime.now() + timedelta(hours=23)
-            self.token_expiry = datetime.now() + timedelta(hours=23)
+            lifetime = timedelta(hours=23)
+            self.session_expiry = self.token_expiry = datetime.now() + lifetime
+            self._valid_until_monotonic = (
+                time.monotonic() + (lifetime - self.refresh_threshold).total_seconds()
+            )
 
             logger.info("Authentication completed successfully")
             return True
@@ -81,14 +89,35 @@ class SharekhanSessionManager:
             logger.error(f"Authentication failed: {e}")
             return False
 
+    async def authenticate_async(
+        self, request_token: str, customer_id: Optional[str] = None
+    ) -> bool:
+        """
+        Run authenticate() off the event loop; concurrent calls with the same
+        request token share a single attempt instead of each generating a session
+        """
+        future = self._auth_inflight.get(request_token)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                None, self.authenticate, request_token, customer_id
+            )
+            self._auth_inflight[request_token] = future
+            future.add_done_callback(
+                lambda _: self._auth_inflight.pop(request_token, None)
+            )
+        # Shield so one caller being cancelled does not cancel the shared attempt
+        return await asyncio.shield(future)
+
     def is_token_valid(self) -> bool:
         """Check if access token is valid"""
-        if not self.client.access_token or not self.token_expiry:
+        if not self.client.access_token:
             return False
 
         # Check if token is expired or will expire soon
-        if datetime.now() >= (self.token_expiry - self.refresh_threshold):
-            logger.warning("Access token expired or expiring soon")
+        if time.monotonic() >= self._valid_until_monotonic:
+            if self.token_expiry:
+                logger.warning("Access token expired or expiring soon")
             return False
 
         return True
@@ -119,4 +148,5 @@ class SharekhanSessionManager:
         self.client.session_token = None
         self.token_expiry = None
         self.session_expiry = None
+        self._valid_until_monotonic = 0.0
         logger.info("Session cleared")
@@ -3,73 +3,150 @@ MCP Tools for Sharekhan Trading API
 Defines all available tools for AI agents
 """
 
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import functools
+from datetime import date
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Type,
+    TypeVar,
+    get_type_hints,
+)
 
 from loguru import logger
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt
 
 from .client import SharekhanClient
+from .client_async import AsyncSharekhanClient
 from .session import SharekhanSessionManager
 
+T = TypeVar("T")
+
+
+async def run_sync(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking call in the default executor (asyncio.to_thread for 3.8)"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(ctx.run, func, *args))
+
 
 # Pydantic models for tool inputs
-class OrderInput(BaseModel):
+class ToolInput(BaseModel):
+    """Base for tool input models: immutable, rejecting unknown fields"""
+
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
+
+TransactionType = Literal["BUY", "SELL"]
+OrderType = Literal["MARKET", "LIMIT", "SL", "SL-M"]
+ProductType = Literal["NRML", "MIS", "CNC"]
+Validity = Literal["DAY", "IOC"]
+
+
+class OrderInput(ToolInput):
     """Input model for placing orders"""
 
     exchange: str = Field(..., description="Exchange name (NSE, BSE)")
     scrip_code: str = Field(..., description="Security code")
-    quantity: int = Field(..., description="Order quantity")
-    price: Optional[float] = Field(
+    quantity: PositiveInt = Field(..., description="Order quantity")
+    price: Optional[PositiveFloat] = Field(
         None, description="Order price (None for market orders)"
     )
-    transaction_type: str = Field(..., description="BUY or SELL")
-    order_type: str = Field(..., description="MARKET, LIMIT, SL, SL-M")
-    product: str = Field(..., description="NRML, MIS, CNC")
-    validity: str = Field("DAY", description="Order validity (DAY, IOC)")
+    transaction_type: TransactionType = Field(..., description="BUY or SELL")
+    order_type: OrderType = Field(..., description="MARKET, LIMIT, SL, SL-M")
+    product: ProductType = Field(..., description="NRML, MIS, CNC")
+    validity: Validity = Field("DAY", description="Order validity (DAY, IOC)")
     customer_id: str = Field("12345", description="Customer ID")
 
 
-class HoldingsInput(BaseModel):
+class BatchOrderInput(ToolInput):
+    """Input model for placing several orders at once"""
+
+    orders: List[OrderInput] = Field(..., description="Orders to place")
+
+
+class HoldingsInput(ToolInput):
     """Input model for getting holdings"""
 
     customer_id: str = Field("12345", description="Customer ID")
 
 
-class HistoricalDataInput(BaseModel):
+class HistoricalDataInput(ToolInput):
     """Input model for historical data"""
 
     exchange: str = Field(..., description="Exchange name")
     scrip_code: str = Field(..., description="Security code")
     interval: str = Field(..., description="Time interval (1minute, 5minute, day)")
-    from_date: str = Field(..., description="From date (YYYY-MM-DD)")
-    to_date: str = Field(..., description="To date (YYYY-MM-DD)")
+    from_date: date = Field(..., description="From date (YYYY-MM-DD)")
+    to_date: date = Field(..., description="To date (YYYY-MM-DD)")
 
 
-class QuoteInput(BaseModel):
+class QuoteInput(ToolInput):
     """Input model for market quotes"""
 
     exchange: str = Field(..., description="Exchange name")
     scrip_code: str = Field(..., description="Security code")
 
 
-class ModifyOrderInput(BaseModel):
+class ModifyOrderInput(ToolInput):
     """Input model for modifying orders"""
 
     order_id: str = Field(..., description="Order ID to modify")
-    price: Optional[float] = Field(None, description="New price")
-    quantity: Optional[int] = Field(None, description="New quantity")
-    order_type: Optional[str] = Field(None, description="New order type")
+    price: Optional[PositiveFloat] = Field(None, description="New price")
+    quantity: Optional[PositiveInt] = Field(None, description="New quantity")
+    order_type: Optional[OrderType] = Field(None, description="New order type")
+
+
+def _tool_input_model(method: Callable[..., Any]) -> Optional[Type[ToolInput]]:
+    """Return the input model a tool takes as its single argument, if any"""
+    hints = get_type_hints(method)
+    hints.pop("return", None)
+    if len(hints) == 1:
+        (hint,) = hints.values()
+        if isinstance(hint, type) and issubclass(hint, ToolInput):
+            return hint
+    return None
 
 
 class SharekhanMCPTools:
     """MCP Tools for Sharekhan trading operations"""
 
     def __init__(
-        self, client: SharekhanClient, session_manager: SharekhanSessionManager
+        self,
+        client: SharekhanClient,
+        session_manager: SharekhanSessionManager,
+        async_client: Optional[AsyncSharekhanClient] = None,
     ):
         self.client = client
         self.session_manager = session_manager
+        self.async_client = async_client or AsyncSharekhanClient(
+            api_key=client.api_key,
+            secret_key=client.secret_key,
+            vendor_key=client.vendor_key,
+        )
+
+        # The tool set is fixed once constructed, so list it a single time
+        self.tool_names = tuple(
+            name
+            for name in dir(self)
+            if not name.startswith("_") and callable(getattr(self, name))
+        )
+        # Bound tool coroutines by name; doubles as the allow-list for dispatch
+        self.tool_methods: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+            name: getattr(self, name) for name in self.tool_names
+        }
+        # Input model per tool, so callers validate a request body exactly once
+        self.tool_input_models: Dict[str, Optional[Type[ToolInput]]] = {
+            name: _tool_input_model(method)
+            for name, method in self.tool_methods.items()
+        }
 
     def _ensure_authenticated(self) -> bool:
         """Ensure client is authenticated before making API calls"""
@@ -78,32 +155,70 @@ class SharekhanMCPTools:
             return False
         return True
 
+    def _get_async_client(self) -> AsyncSharekhanClient:
+        """Return the async client carrying the current session's access token"""
+        self.async_client.access_token = self.client.access_token
+        return self.async_client
+
+    @staticmethod
+    def _order_params(input_data: OrderInput) -> Dict[str, Any]:
+        """Build Sharekhan order parameters from validated tool input"""
+        order_params: Dict[str, Any] = {
+            "exchange": input_data.exchange,
+            "scrip_code": input_data.scrip_code,
+            "quantity": input_data.quantity,
+            "transaction_type": input_data.transaction_type,
+            "order_type": input_data.order_type,
+            "product": input_data.product,
+            "validity": input_data.validity,
+            "customer_id": input_data.customer_id,
+        }
+
+        if input_data.price:
+            order_params["price"] = input_data.price
+
+        return order_params
+
     async def place_order(self, input_data: OrderInput) -> Dict[str, Any]:
         """Place a new order"""
         try:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            order_params = {
-                "exchange": input_data.exchange,
-                "scrip_code": input_data.scrip_code,
-                "quantity": input_data.quantity,
-                "transaction_type": input_data.transaction_type,
-                "order_type": input_data.order_type,
-                "product": input_data.product,
-                "validity": input_data.validity,
-                "customer_id": input_data.customer_id,
-            }
-
-            if input_data.price:
-                order_params["price"] = input_data.price
+            order_params = self._order_params(input_data)
 
-            result = self.client.place_order(order_params)
-            logger.info(f"Order placed: {result}")
+            result = await run_sync(self.client.place_order, order_params)
+            logger.info("Order placed: {}", result)
             return {"status": "success", "data": result}
 
         except Exception as e:
-            logger.error(f"Failed to place order: {e}")
+            logger.error("Failed to place order: {}", e)
+            return {"status": "error", "message": str(e)}
+
+    async def place_orders_batch(self, input_data: BatchOrderInput) -> Dict[str, Any]:
+        """Place several orders concurrently"""
+        try:
+            if not self._ensure_authenticated():
+                return {"status": "error", "message": "Authentication required"}
+
+            results = await self._get_async_client().placeOrders(
+                [self._order_params(order) for order in input_data.orders],
+                return_exceptions=True,
+            )
+
+            data = [
+                (
+                    {"status": "error", "message": str(result)}
+                    if isinstance(result, Exception)
+                    else {"status": "success", "data": result}
+                )
+                for result in results
+            ]
+            logger.info("Placed batch of {} orders", len(data))
+            return {"status": "success", "data": data}
+
+        except Exception as e:
+            logger.error("Failed to place order batch: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def cancel_order(self, order_id: str) -> Dict[str, Any]:
@@ -112,12 +227,12 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            result = self.client.cancel_order(order_id)
-            logger.info(f"Order cancelled: {result}")
+            result = await run_sync(self.client.cancel_order, order_id)
+            logger.info("Order cancelled: {}", result)
             return {"status": "success", "data": result}
 
         except Exception as e:
-            logger.error(f"Failed to cancel order: {e}")
+            logger.error("Failed to cancel order: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def modify_order(self, input_data: ModifyOrderInput) -> Dict[str, Any]:
@@ -126,20 +241,22 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            modify_params = {}
+            modify_params: Dict[str, Any] = {}
             if input_data.price:
                 modify_params["price"] = input_data.price
             if input_data.quantity:
                 modify_params["quantity"] = input_data.quantity
             if input_data.order_type:
-                modify_params["order_type"] = str(input_data.order_type)  # type: ignore
+                modify_params["order_type"] = input_data.order_type
 
-            result = self.client.modify_order(input_data.order_id, modify_params)
-            logger.info(f"Order modified: {result}")
+            result = await run_sync(
+                self.client.modify_order, input_data.order_id, modify_params
+            )
+            logger.info("Order modified: {}", result)
             return {"status": "success", "data": result}
 
         except Exception as e:
-            logger.error(f"Failed to modify order: {e}")
+            logger.error("Failed to modify order: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_holdings(self, input_data: HoldingsInput) -> Dict[str, Any]:
@@ -148,12 +265,12 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            holdings = self.client.holdings(input_data.customer_id)
-            logger.info(f"Retrieved {len(holdings)} holdings")
+            holdings = await run_sync(self.client.holdings, input_data.customer_id)
+            logger.info("Retrieved {} holdings", len(holdings))
             return {"status": "success", "data": holdings}
 
         except Exception as e:
-            logger.error(f"Failed to get holdings: {e}")
+            logger.error("Failed to get holdings: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_positions(self, customer_id: str = "12345") -> Dict[str, Any]:
@@ -162,12 +279,12 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            positions = self.client.positions(customer_id)
-            logger.info(f"Retrieved positions for customer {customer_id}")
+            positions = await run_sync(self.client.positions, customer_id)
+            logger.info("Retrieved positions for customer {}", customer_id)
             return {"status": "success", "data": positions}
 
         except Exception as e:
-            logger.error(f"Failed to get positions: {e}")
+            logger.error("Failed to get positions: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_orders(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
@@ -176,12 +293,12 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            orders = self.client.orders(customer_id)
-            logger.info(f"Retrieved {len(orders)} orders")
+            orders = await run_sync(self.client.orders, customer_id)
+            logger.info("Retrieved {} orders", len(orders))
             return {"status": "success", "data": orders}
 
         except Exception as e:
-            logger.error(f"Failed to get orders: {e}")
+            logger.error("Failed to get orders: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_trades(self, customer_id: str = "12345") -> Dict[str, Any]:
@@ -190,12 +307,28 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            trades = self.client.trades(customer_id)
-            logger.info(f"Retrieved {len(trades)} trades")
+            trades = await run_sync(self.client.trades, customer_id)
+            logger.info("Retrieved {} trades", len(trades))
             return {"status": "success", "data": trades}
 
         except Exception as e:
-            logger.error(f"Failed to get trades: {e}")
+            logger.error("Failed to get trades: {}", e)
+            return {"status": "error", "message": str(e)}
+
+    async def get_portfolio_snapshot(
+        self, customer_id: str = "12345"
+    ) -> Dict[str, Any]:
+        """Get holdings, positions, orders and trades in one call"""
+        try:
+            if not self._ensure_authenticated():
+                return {"status": "error", "message": "Authentication required"}
+
+            snapshot = await self._get_async_client().portfolio_snapshot(customer_id)
+            logger.info("Retrieved portfolio snapshot for customer {}", customer_id)
+            return {"status": "success", "data": snapshot}
+
+        except Exception as e:
+            logger.error("Failed to get portfolio snapshot: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_historical_data(
@@ -206,21 +339,19 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            from_date = datetime.strptime(input_data.from_date, "%Y-%m-%d")
-            to_date = datetime.strptime(input_data.to_date, "%Y-%m-%d")
-
-            data = self.client.historical_data(
+            data = await run_sync(
+                self.client.historical_data,
                 input_data.exchange,
                 input_data.scrip_code,
                 input_data.interval,
-                from_date,
-                to_date,
+                input_data.from_date,
+                input_data.to_date,
             )
-            logger.info(f"Retrieved {len(data)} historical data points")
+            logger.info("Retrieved {} historical data points", len(data))
             return {"status": "success", "data": data}
 
         except Exception as e:
-            logger.error(f"Failed to get historical data: {e}")
+            logger.error("Failed to get historical data: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_quote(self, input_data: QuoteInput) -> Dict[str, Any]:
@@ -229,12 +360,18 @@ class SharekhanMCPTools:
             if not self._ensure_authenticated():
                 return {"status": "error", "message": "Authentication required"}
 
-            quote = self.client.quote(input_data.exchange, input_data.scrip_code)
-            logger.info(f"Retrieved quote for {input_data.scrip_code}")
+            # Serve repeat lookups from the client's short-TTL quote cache
+            # without a thread pool hop
+            quote = self.client.cached_quote(input_data.exchange, input_data.scrip_code)
+            if quote is None:
+                quote = await run_sync(
+                    self.client.quote, input_data.exchange, input_data.scrip_code
+                )
+            logger.info("Retrieved quote for {}", input_data.scrip_code)
             return {"status": "success", "data": quote}
 
         except Exception as e:
-            logger.error(f"Failed to get quote: {e}")
+            logger.error("Failed to get quote: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def authenticate(
@@ -242,14 +379,16 @@ class SharekhanMCPTools:
     ) -> Dict[str, Any]:
         """Authenticate with Sharekhan using request token"""
         try:
-            success = self.session_manager.authenticate(request_token, customer_id)
+            success = await self.session_manager.authenticate_async(
+                request_token, customer_id
+            )
             if success:
                 return {"status": "success", "message": "Authentication successful"}
             else:
                 return {"status": "error", "message": "Authentication failed"}
 
         except Exception as e:
-            logger.error(f"Authentication failed: {e}")
+            logger.error("Authentication failed: {}", e)
             return {"status": "error", "message": str(e)}
 
     async def get_login_url(self) -> Dict[str, Any]:
@@ -259,5 +398,5 @@ class SharekhanMCPTools:
             return {"status": "success", "data": {"login_url": login_url}}
 
         except Exception as e:
-            logger.error(f"Failed to get login URL: {e}")
+            logger.error("Failed to get login URL: {}", e)
             return {"status": "error", "message": str(e)}
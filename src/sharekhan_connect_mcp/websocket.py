@@ -4,66 +4,151 @@ Handles live market data feeds and real-time updates
 """
 
 import asyncio
-import json
+import contextvars
+import functools
 import threading
 import time
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import orjson
 import websockets
 from loguru import logger
-from websockets.client import ClientProtocol
+from websockets.asyncio.client import ClientConnection, connect
+
+try:
+    import uvloop
+
+    # Faster loop for the thread start() owns; ships with uvicorn[standard]
+    _new_event_loop: Callable[[], asyncio.AbstractEventLoop] = uvloop.new_event_loop
+except ImportError:  # not available on Windows
+    _new_event_loop = asyncio.new_event_loop
+
+# True while _trigger runs callbacks, which inherit the context, so
+# disconnect() can tell it was called from inside one of them
+_IN_CALLBACK: "contextvars.ContextVar[bool]" = contextvars.ContextVar(
+    "sharekhan_ws_in_callback", default=False
+)
+
+# Control frames whose content never changes, encoded once at import
+_PONG_FRAME = orjson.dumps({"type": "pong"}).decode()
 
 
 class SharekhanWebSocketClient:
     """Sharekhan WebSocket client for live market data"""
 
+    # Frames buffered between the socket reader and the dispatcher, and how
+    # many queued frames the dispatcher handles per wake-up
+    INBOX_MAXSIZE = 1024
+    DRAIN_BATCH = 64
+
     def __init__(
         self,
         access_token: str,
         ws_url: str = "wss://api.sharekhan.com/v1/stream/websocket",
+        compress: Optional[str] = None,
     ):
         self.access_token = access_token
         self.ws_url = ws_url
-        self.websocket: Optional[ClientProtocol] = None
+        # permessage-deflate costs CPU on every frame; only worth enabling
+        # ("deflate") over a bandwidth-constrained link
+        self.compress = compress
+        self.websocket: Optional[ClientConnection] = None
         self.is_connected = False
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
         self.reconnect_delay = 5
 
         # Subscription management
-        self.subscriptions: Dict[str, Dict[str, Any]] = {}
-        self.callback_handlers: Dict[str, List[Callable]] = {
-            "ticks": [],
-            "quotes": [],
-            "orders": [],
-            "trades": [],
-            "errors": [],
+        # Keyed by an integer id from a counter, so ids are never reused after
+        # an unsubscribe; callers see the id as a string
+        self.subscriptions: Dict[int, Dict[str, Any]] = {}
+        self._next_sub_id = 0
+        # Each subscription's token list as first encoded, replayed verbatim
+        # on reconnect
+        self._subscription_frames: Dict[int, str] = {}
+        # (sync_callbacks, async_callbacks) per event type, classified once
+        # in add_callback rather than on every dispatched message
+        self.callback_handlers: Dict[str, Tuple[List[Callable], List[Callable]]] = {
+            event_type: ([], [])
+            for event_type in ("ticks", "quotes", "orders", "trades", "errors")
         }
 
+        # Message type -> handler, looked up once per inbound message
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+            "tick": functools.partial(self._trigger, "ticks"),
+            "quote": functools.partial(self._trigger, "quotes"),
+            "order": functools.partial(self._trigger, "orders"),
+            "trade": functools.partial(self._trigger, "trades"),
+            "error": self._handle_error,
+            "ping": self._handle_ping,
+        }
+
+        # Event type that untyped frames are routed to, set via focus()
+        self._primary_event_type: Optional[str] = None
+        self._primary_handler: Optional[Callable[[Any], Awaitable[None]]] = None
+
         # Thread management
         self.ws_thread: Optional[threading.Thread] = None
+        self._run_task: Optional["asyncio.Task[None]"] = None
+        self._listener_task: Optional["asyncio.Task[None]"] = None
+        self._dispatcher_task: Optional["asyncio.Task[None]"] = None
         self.should_run = False
 
     def add_callback(self, event_type: str, callback: Callable) -> None:
         """Add callback for specific event types"""
         if event_type in self.callback_handlers:
-            self.callback_handlers[event_type].append(callback)
+            sync_callbacks, async_callbacks = self.callback_handlers[event_type]
+            if asyncio.iscoroutinefunction(callback):
+                async_callbacks.append(callback)
+            else:
+                sync_callbacks.append(callback)
             logger.info(f"Added callback for {event_type}")
         else:
             logger.warning(f"Unknown event type: {event_type}")
 
     def remove_callback(self, event_type: str, callback: Callable) -> None:
         """Remove callback for specific event types"""
-        if (
-            event_type in self.callback_handlers
-            and callback in self.callback_handlers[event_type]
-        ):
-            self.callback_handlers[event_type].remove(callback)
-            logger.info(f"Removed callback for {event_type}")
+        for callbacks in self.callback_handlers.get(event_type, ()):
+            if callback in callbacks:
+                callbacks.remove(callback)
+                logger.info(f"Removed callback for {event_type}")
+                return
+
+    def focus(self, event_type: Optional[str]) -> None:
+        """
+        Route frames that carry no type field straight to one event type
+
+        For feeds subscribed to a single stream (e.g. ticks only), this skips
+        the type lookup for the dominant frames; typed control frames such as
+        pings and errors are still dispatched normally. Pass None to go back
+        to dropping untyped frames.
+        """
+        if event_type is None:
+            self._primary_event_type = None
+            self._primary_handler = None
+        elif event_type in self.callback_handlers:
+            self._primary_event_type = event_type
+            self._primary_handler = functools.partial(self._trigger, event_type)
+            logger.info(f"Focused WebSocket dispatch on {event_type}")
+        else:
+            logger.warning(f"Unknown event type: {event_type}")
 
     async def connect(self) -> bool:
         """Connect to Sharekhan WebSocket"""
+        if not await self._open():
+            return False
+
+        # Start message listener, keeping a reference so it is neither garbage
+        # collected mid-flight nor left running after disconnect()
+        self._listener_task = asyncio.create_task(
+            self._message_listener(), name="sharekhan-ws-listener"
+        )
+
+        return True
+
+    async def _open(self) -> bool:
+        """Open the socket and replay subscriptions, without starting a listener"""
         try:
             logger.info(f"Connecting to Sharekhan WebSocket: {self.ws_url}")
 
@@ -73,9 +158,13 @@ class SharekhanWebSocketClient:
                 "User-Agent": "Sharekhan-MCP-Server/1.0.0",
             }
 
-            self.websocket = await websockets.connect(
-                self.ws_url, extra_headers=headers, ping_interval=30, ping_timeout=10
-            )  # type: ignore
+            self.websocket = await connect(
+                self.ws_url,
+                additional_headers=headers,
+                ping_interval=30,
+                ping_timeout=10,
+                compression=self.compress,
+            )
 
             self.is_connected = True
             self.reconnect_attempts = 0
@@ -85,9 +174,6 @@ class SharekhanWebSocketClient:
             # Send initial subscription requests
             await self._resubscribe_all()
 
-            # Start message listener
-            asyncio.create_task(self._message_listener())
-
             return True
 
         except Exception as e:
@@ -102,158 +188,202 @@ class SharekhanWebSocketClient:
 
         if self.websocket:
             try:
-                await self.websocket.close()  # type: ignore
+                await self.websocket.close()
                 logger.info("Disconnected from WebSocket")
             except Exception as e:
                 logger.error(f"Error closing WebSocket: {e}")
 
+        # Stop background tasks, skipping the one disconnect() is running in
+        current = asyncio.current_task()
+        tasks = [
+            task
+            for task in (self._listener_task, self._run_task, self._dispatcher_task)
+            if task is not None and task is not current and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        # From a callback, the listener or dispatcher is itself waiting on this
+        # call, so awaiting them would deadlock; cancelling is enough
+        if tasks and not _IN_CALLBACK.get():
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._listener_task = self._run_task = self._dispatcher_task = None
+
         if self.ws_thread and self.ws_thread.is_alive():
             self.ws_thread.join(timeout=5)
 
     async def _message_listener(self) -> None:
-        """Listen for WebSocket messages"""
-        try:
-            while self.is_connected and self.websocket:
-                try:
-                    message = await asyncio.wait_for(self.websocket.recv(), timeout=30)  # type: ignore
-                    await self._handle_message(message)
+        """Listen for WebSocket messages, reconnecting while the client runs"""
+        while True:
+            await self._receive_messages()
+            if not (self.should_run and await self._attempt_reconnect()):
+                return
 
-                except asyncio.TimeoutError:
-                    # Send ping to keep connection alive
-                    if self.websocket:
-                        await self.websocket.ping()  # type: ignore
-                    continue
+    async def _receive_messages(self) -> None:
+        """Receive and dispatch messages until the connection drops"""
+        ws = self.websocket
+        if ws is None:
+            return
 
-                except websockets.exceptions.ConnectionClosed:
-                    logger.warning("WebSocket connection closed")
-                    break
+        # recv() only feeds the inbox; a separate task dispatches in batches
+        inbox: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(self.INBOX_MAXSIZE)
+        dispatcher = self._dispatcher_task = asyncio.create_task(
+            self._drain_inbox(inbox), name="sharekhan-ws-dispatcher"
+        )
+        # The connection is fixed for this call, so bind per-frame lookups once
+        recv = ws.recv
+        put_nowait = inbox.put_nowait
+        try:
+            try:
+                while self.is_connected:
+                    try:
+                        # Raw UTF-8 bytes go straight to orjson without a str
+                        # decode. Keepalive pings come from ping_interval set in
+                        # connect()
+                        message = await recv(decode=False)
+                        try:
+                            put_nowait(message)
+                        except asyncio.QueueFull:
+                            # Backpressure: stop reading until the dispatcher
+                            # catches up
+                            await inbox.put(message)
+
+                    except websockets.exceptions.ConnectionClosed:
+                        logger.warning("WebSocket connection closed")
+                        break
+
+                    except Exception as e:
+                        logger.error(f"Error in message listener: {e}")
+                        await self._trigger("errors", e)
+                        break
 
-                except Exception as e:
-                    logger.error(f"Error in message listener: {e}")
-                    await self._trigger_error_callbacks(e)
-                    break
+            except Exception as e:
+                logger.error(f"Message listener error: {e}")
+
+            # Let the dispatcher finish frames already received before
+            # reconnecting, unless disconnect() has already stopped it
+            if not dispatcher.done():
+                await inbox.put(None)
+                await asyncio.wait([dispatcher])
+        finally:
+            # Also reached when this listener is cancelled mid-read or mid-drain
+            dispatcher.cancel()
+            if self._dispatcher_task is dispatcher:
+                self._dispatcher_task = None
+
+    async def _drain_inbox(self, inbox: "asyncio.Queue[Optional[bytes]]") -> None:
+        """Dispatch received frames, draining up to DRAIN_BATCH per wake-up"""
+        get, get_nowait, empty = inbox.get, inbox.get_nowait, inbox.empty
+        handle = self._handle_message
+        batch_size = self.DRAIN_BATCH
+        while True:
+            batch = [await get()]
+            while len(batch) < batch_size and not empty():
+                batch.append(get_nowait())
+            for message in batch:
+                if message is None:
+                    return
+                await handle(message)
+
+    async def _handle_message(self, message: bytes) -> None:
+        """Handle incoming WebSocket message"""
+        try:
+            data = orjson.loads(message)
 
-        except Exception as e:
-            logger.error(f"Message listener error: {e}")
+            primary = self._primary_handler
+            if primary is not None and "type" not in data:
+                await primary(data)
+                return
+
+            try:
+                message_type = data["type"]
+            except KeyError:
+                logger.warning("WebSocket message missing type")
+                return
 
-        # Attempt reconnection
-        if self.should_run:
-            await self._attempt_reconnect()
+            # Formatted by loguru only when a sink accepts DEBUG
+            logger.debug("Received WebSocket message: {}", message_type)
 
-    async def _handle_message(self, message: str) -> None:
-        """Handle incoming WebSocket message"""
-        try:
-            data = json.loads(message)
-            message_type = data.get("type", "unknown")
-
-            logger.debug(f"Received WebSocket message: {message_type}")
-
-            if message_type == "tick":
-                await self._trigger_tick_callbacks(data)
-            elif message_type == "quote":
-                await self._trigger_quote_callbacks(data)
-            elif message_type == "order":
-                await self._trigger_order_callbacks(data)
-            elif message_type == "trade":
-                await self._trigger_trade_callbacks(data)
-            elif message_type == "error":
-                logger.error(f"WebSocket error: {data}")
-                await self._trigger_error_callbacks(data)
-            elif message_type == "ping":
-                # Respond to server ping
-                await self.send_message({"type": "pong"})
+            handler = self._dispatch.get(message_type)
+            if handler is not None:
+                await handler(data)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to decode WebSocket message: {e}")
         except Exception as e:
             logger.error(f"Error handling WebSocket message: {e}")
 
-    async def _trigger_tick_callbacks(self, data: Dict[str, Any]) -> None:
-        """Trigger tick data callbacks"""
-        for callback in self.callback_handlers["ticks"]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(data)
-                else:
-                    callback(data)
-            except Exception as e:
-                logger.error(f"Error in tick callback: {e}")
-
-    async def _trigger_quote_callbacks(self, data: Dict[str, Any]) -> None:
-        """Trigger quote callbacks"""
-        for callback in self.callback_handlers["quotes"]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(data)
-                else:
-                    callback(data)
-            except Exception as e:
-                logger.error(f"Error in quote callback: {e}")
+    async def _handle_error(self, data: Dict[str, Any]) -> None:
+        """Log a server-reported error and notify error callbacks"""
+        logger.error(f"WebSocket error: {data}")
+        await self._trigger("errors", data)
 
-    async def _trigger_order_callbacks(self, data: Dict[str, Any]) -> None:
-        """Trigger order update callbacks"""
-        for callback in self.callback_handlers["orders"]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(data)
-                else:
-                    callback(data)
-            except Exception as e:
-                logger.error(f"Error in order callback: {e}")
+    async def _handle_ping(self, data: Dict[str, Any]) -> None:
+        """Respond to server ping"""
+        await self._send_raw(_PONG_FRAME)
 
-    async def _trigger_trade_callbacks(self, data: Dict[str, Any]) -> None:
-        """Trigger trade update callbacks"""
-        for callback in self.callback_handlers["trades"]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(data)
-                else:
+    async def _trigger(self, event_type: str, data: Any) -> None:
+        """Invoke the callbacks registered for an event type"""
+        sync_callbacks, async_callbacks = self.callback_handlers[event_type]
+        mark = _IN_CALLBACK.set(True)
+        try:
+            for callback in sync_callbacks:
+                try:
                     callback(data)
-            except Exception as e:
-                logger.error(f"Error in trade callback: {e}")
-
-    async def _trigger_error_callbacks(self, error: Any) -> None:
-        """Trigger error callbacks"""
-        for callback in self.callback_handlers["errors"]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(error)
-                else:
-                    callback(error)
-            except Exception as e:
-                logger.error(f"Error in error callback: {e}")
-
-    async def send_message(self, message: Dict[str, Any]) -> None:
-        """Send message to WebSocket"""
+                except Exception as e:
+                    logger.error(f"Error in {event_type} callback: {e}")
+            if async_callbacks:
+                # Failures come back as results, so one bad subscriber neither
+                # cancels the others nor needs a wrapper coroutine per callback
+                results = await asyncio.gather(
+                    *[callback(data) for callback in async_callbacks],
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        logger.error(f"Error in {event_type} callback: {result}")
+        finally:
+            _IN_CALLBACK.reset(mark)
+
+    async def _send_raw(self, frame: str) -> bool:
+        """Send an already encoded frame, returning whether it was sent"""
         if self.websocket and self.is_connected:
             try:
-                await self.websocket.send(json.dumps(message))  # type: ignore
-                logger.debug(f"Sent WebSocket message: {message.get('type')}")
+                await self.websocket.send(frame)
+                return True
             except Exception as e:
                 logger.error(f"Failed to send WebSocket message: {e}")
         else:
             logger.warning("WebSocket not connected, cannot send message")
+        return False
+
+    async def send_message(self, message: Dict[str, Any]) -> None:
+        """Send message to WebSocket"""
+        # Sent as a text frame; the feed protocol is JSON over text
+        if await self._send_raw(orjson.dumps(message).decode()):
+            logger.opt(lazy=True).debug(
+                "Sent WebSocket message: {}", lambda: message.get("type")
+            )
 
     async def subscribe(self, token_list: Dict[str, Any]) -> str:
         """Subscribe to market data (matches SharekhanConnect API)"""
+        sub_id = self._next_sub_id
+        self._next_sub_id += 1
+        self.subscriptions[sub_id] = token_list
+        frame = self._subscription_frames[sub_id] = orjson.dumps(token_list).decode()
+
         if not self.is_connected:
+            # Stored subscription is sent on the next connect
             logger.warning("WebSocket not connected, subscription queued")
-            # Store subscription for later
-            subscription_id = f"subscription_{len(self.subscriptions)}"
-            self.subscriptions[subscription_id] = token_list
-            return subscription_id
-
-        subscription_id = f"subscription_{len(self.subscriptions)}"
-        self.subscriptions[subscription_id] = token_list
+            return str(sub_id)
 
         # Send subscription message in Sharekhan format
-        await self.send_message(token_list)
+        await self._send_raw(frame)
         logger.info(
             f"Subscribed to {token_list.get('key', 'unknown')} for {len(token_list.get('value', []))} instruments"
         )
-        return subscription_id
+        return str(sub_id)
 
     async def fetchData(self, feed_data: Dict[str, Any]) -> None:
         """Fetch depth data (matches SharekhanConnect API)"""
@@ -289,11 +419,17 @@ class SharekhanWebSocketClient:
 
     async def unsubscribe_legacy(self, subscription_id: str) -> None:
         """Unsubscribe from market data (legacy method)"""
-        if subscription_id in self.subscriptions:
+        try:
+            sub_id = int(subscription_id)
+        except ValueError:
+            return
+
+        if sub_id in self.subscriptions:
             message = {"action": "unsubscribe", "subscription_id": subscription_id}
 
             await self.send_message(message)
-            del self.subscriptions[subscription_id]
+            del self.subscriptions[sub_id]
+            self._subscription_frames.pop(sub_id, None)
             logger.info(f"Unsubscribed from {subscription_id}")
 
     def close_connection(self) -> None:
@@ -302,17 +438,17 @@ class SharekhanWebSocketClient:
 
     async def _resubscribe_all(self) -> None:
         """Resubscribe to all previous subscriptions"""
-        for subscription_id, subscription_data in self.subscriptions.items():
-            message = {
-                "type": "subscribe",
-                "subscription_id": subscription_id,
-                "data": subscription_data,
-            }
-            await self.send_message(message)
-            logger.info(f"Resubscribed to {subscription_id}")
-
-    async def _attempt_reconnect(self) -> None:
-        """Attempt to reconnect to WebSocket"""
+        # Same frames subscribe() sent, so the server sees identical requests
+        frames = self._subscription_frames
+        for sub_id, token_list in self.subscriptions.items():
+            frame = frames.get(sub_id)
+            if frame is None:
+                frame = frames[sub_id] = orjson.dumps(token_list).decode()
+            await self._send_raw(frame)
+            logger.info(f"Resubscribed to {sub_id}")
+
+    async def _attempt_reconnect(self) -> bool:
+        """Attempt to reconnect to WebSocket, returning whether it succeeded"""
         while self.reconnect_attempts < self.max_reconnect_attempts and self.should_run:
             self.reconnect_attempts += 1
             logger.info(
@@ -321,25 +457,46 @@ class SharekhanWebSocketClient:
 
             await asyncio.sleep(self.reconnect_delay)
 
-            if await self.connect():
+            if await self._open():
                 logger.info("WebSocket reconnected successfully")
-                return
+                return True
 
         logger.error(
             f"Failed to reconnect after {self.max_reconnect_attempts} attempts"
         )
+        return False
+
+    async def run(self) -> None:
+        """
+        Connect and process messages on the running event loop until stopped
+
+        Async applications should await this instead of calling start(), so
+        callbacks run on their own loop rather than a background thread.
+        """
+        self.should_run = True
+        if await self._open() or await self._attempt_reconnect():
+            await self._message_listener()
 
     def start(self) -> None:
-        """Start WebSocket connection in background thread"""
+        """Start WebSocket connection on the running loop, or a background thread"""
         self.should_run = True
 
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not None:
+            self._run_task = running_loop.create_task(self.run())
+            logger.info("WebSocket client scheduled on the running event loop")
+            return
+
         def run_websocket() -> None:
-            loop = asyncio.new_event_loop()
+            loop = _new_event_loop()
             asyncio.set_event_loop(loop)
 
             try:
-                loop.run_until_complete(self.connect())
-                loop.run_forever()
+                loop.run_until_complete(self.run())
             except Exception as e:
                 logger.error(f"WebSocket thread error: {e}")
             finally:
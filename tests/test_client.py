@@ -0,0 +1,185 @@
+"""Tests for the synchronous Sharekhan API client."""
+
+import inspect
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+import requests
+from cachetools import TTLCache
+
+from sharekhan_connect_mcp.client import SharekhanClient
+
+
+@pytest.fixture
+def client():
+    """Authenticated client whose HTTP session is never used."""
+    client = SharekhanClient(api_key="key", secret_key="secret")
+    client.access_token = "token"
+    yield client
+    client.close()
+
+
+def test_endpoint_methods_keep_typed_signatures():
+    """Endpoint wrappers expose their named parameters and return types."""
+    signature = inspect.signature(SharekhanClient.exchangetrades)
+
+    assert list(signature.parameters) == ["self", "exchange", "customerId", "orderId"]
+    assert signature.return_annotation == List[Dict[str, Any]]
+
+
+def test_endpoint_rejects_conflicting_arguments(client):
+    """Passing the same argument positionally and by keyword is a TypeError."""
+    with mock.patch.object(SharekhanClient, "_make_request") as make_request:
+        with pytest.raises(TypeError):
+            client.holdings("1", customerId="2")
+
+    make_request.assert_not_called()
+
+
+def test_endpoint_maps_arguments_to_query_params(client):
+    """Arguments become query parameters and the result key is unwrapped."""
+    with mock.patch.object(
+        SharekhanClient, "_make_request", return_value={"trades": [{"id": 1}]}
+    ) as make_request:
+        trades = client.exchangetrades("NC", customerId="42", orderId="7")
+
+    assert trades == [{"id": 1}]
+    make_request.assert_called_once_with(
+        "GET",
+        client._urls["order_trades"],
+        params={"exchange": "NC", "customer_id": "42", "order_id": "7"},
+    )
+
+
+def test_client_methods_can_be_patched_per_instance(client):
+    """Instances accept per-object stubs, as mock.patch.object needs."""
+    with mock.patch.object(client, "holdings", return_value=[{"isin": "X"}]):
+        assert client.holdings("1") == [{"isin": "X"}]
+
+    client._make_request = mock.Mock(return_value={"holdings": []})
+    assert client.holdings("1") == []
+
+
+def _history_response(close):
+    return {"data": [{"close": close}]}
+
+
+def test_historicaldata_is_served_from_cache(client):
+    """A repeated lookup inside the TTL makes no second request."""
+    client._make_request = mock.Mock(return_value=_history_response(10))
+
+    first = client.historicaldata("NC", "2885", "day")
+    second = client.historicaldata("NC", "2885", "day")
+
+    assert first == second == [{"close": 10}]
+    client._make_request.assert_called_once()
+
+
+def test_cached_results_are_independent_copies(client):
+    """Mutating a returned result does not change what later callers get."""
+    client._make_request = mock.Mock(return_value=_history_response(10))
+
+    first = client.historicaldata("NC", "2885", "day")
+    first[0]["close"] = 999
+    first.append({"close": 0})
+    second = client.historicaldata("NC", "2885", "day")
+
+    assert second is not first
+    assert second == [{"close": 10}]
+
+
+def test_cache_key_includes_every_argument(client):
+    """Lookups differing in any argument are cached separately."""
+    client._make_request = mock.Mock(
+        side_effect=[_history_response(1), _history_response(2)]
+    )
+
+    assert client.historicaldata("NC", "2885", "day") == [{"close": 1}]
+    assert client.historicaldata("NC", "2885", "5minute") == [{"close": 2}]
+    assert client._make_request.call_count == 2
+
+
+def test_cache_entries_expire_after_ttl(client):
+    """Entries older than the TTL are fetched again."""
+    now = [0.0]
+    client._history_cache = TTLCache(
+        maxsize=8, ttl=client.HISTORY_CACHE_TTL, timer=lambda: now[0]
+    )
+    client._make_request = mock.Mock(
+        side_effect=[_history_response(1), _history_response(2)]
+    )
+
+    assert client.historicaldata("NC", "2885", "day") == [{"close": 1}]
+    now[0] = client.HISTORY_CACHE_TTL - 1
+    assert client.historicaldata("NC", "2885", "day") == [{"close": 1}]
+    now[0] = client.HISTORY_CACHE_TTL + 1
+    assert client.historicaldata("NC", "2885", "day") == [{"close": 2}]
+
+
+def test_invalidate_cache_forces_refetch(client):
+    """invalidate_cache drops master, quote and history entries."""
+    client._make_request = mock.Mock(
+        return_value={"master": [{"scrip": "A"}], "ltp": 1.0}
+    )
+
+    client.master("NC")
+    client.quote("NC", "2885")
+    assert client.cached_quote("NC", "2885") == {
+        "master": [{"scrip": "A"}],
+        "ltp": 1.0,
+    }
+
+    client.invalidate_cache()
+
+    assert client.cached_quote("NC", "2885") is None
+    client.master("NC")
+    assert client._make_request.call_count == 3
+
+
+def test_cached_quote_returns_a_copy(client):
+    """cached_quote hands out a copy, not the cached object."""
+    client._make_request = mock.Mock(return_value={"ltp": 1.0})
+    client.quote("NC", "2885")
+
+    peeked = client.cached_quote("NC", "2885")
+    peeked["ltp"] = 2.0
+
+    assert client.cached_quote("NC", "2885") == {"ltp": 1.0}
+
+
+def test_request_headers_returns_a_copy(client):
+    """Editing requestHeaders() output leaves later requests unaffected."""
+    headers = client.requestHeaders()
+    headers["X-Debug"] = "1"
+
+    assert "X-Debug" not in client.requestHeaders()
+    assert client.requestHeaders()["Authorization"] == "Bearer token"
+
+
+def _response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+def test_make_request_decodes_json_body(client):
+    """A JSON body is returned as a dict."""
+    client._session.request = mock.Mock(return_value=_response(200, b'{"ok": 1}'))
+
+    assert client._make_request("GET", "https://api.example/x") == {"ok": 1}
+
+
+@pytest.mark.parametrize("content", [b"", b"<html>Bad gateway</html>"])
+def test_non_json_body_raises_request_exception(client, content):
+    """Empty or HTML bodies raise requests' JSONDecodeError and are logged."""
+    client._session.request = mock.Mock(return_value=_response(200, content))
+
+    with mock.patch("sharekhan_connect_mcp.client.logger") as log:
+        with pytest.raises(requests.exceptions.JSONDecodeError) as excinfo:
+            client._make_request("GET", "https://api.example/x")
+
+    assert isinstance(excinfo.value, requests.exceptions.RequestException)
+    assert excinfo.value.response.status_code == 200
+    log.error.assert_called_once()
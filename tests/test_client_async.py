@@ -0,0 +1,196 @@
+"""Tests for the async Sharekhan API client."""
+
+import httpx
+import orjson
+import pytest
+
+from sharekhan_connect_mcp.client import SharekhanClient
+from sharekhan_connect_mcp.client_async import AsyncSharekhanClient
+
+
+def _client(handler, access_token="token"):
+    """Async client whose requests are answered by handler."""
+    return AsyncSharekhanClient(
+        api_key="key",
+        secret_key="secret",
+        access_token=access_token,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_endpoints_match_sync_client():
+    """Both clients build URLs from the same endpoint table."""
+    sync_client = SharekhanClient(api_key="key", secret_key="secret")
+    async_client = AsyncSharekhanClient(api_key="key", secret_key="secret")
+
+    assert async_client.base_url == sync_client.base_url
+    assert async_client.endpoints == sync_client.endpoints
+    sync_client.close()
+
+
+@pytest.mark.asyncio
+async def test_make_request_sends_auth_params_and_body():
+    """Requests carry the bearer token, query params and an orjson body."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    async with _client(handler) as client:
+        result = await client._make_request(
+            "POST", "/orders", params={"a": "1"}, data={"qty": 5}
+        )
+
+    assert result == {"ok": True}
+    [request] = seen
+    assert request.method == "POST"
+    assert str(request.url) == "https://api.sharekhan.com/v1/orders?a=1"
+    assert request.headers["Authorization"] == "Bearer token"
+    assert orjson.loads(request.content) == {"qty": 5}
+
+
+@pytest.mark.asyncio
+async def test_master_uses_shared_endpoint():
+    """master() requests the master path from the endpoint table."""
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"master": [{"scrip": "A"}]})
+
+    async with _client(handler) as client:
+        assert await client.master("NC") == [{"scrip": "A"}]
+
+    assert paths == ["/v1" + client.endpoints["master"]]
+
+
+@pytest.mark.asyncio
+async def test_make_request_requires_access_token():
+    """Without a token no request is sent."""
+
+    def handler(request):
+        raise AssertionError("request should not be sent")
+
+    async with _client(handler, access_token=None) as client:
+        with pytest.raises(ValueError):
+            await client._make_request("GET", "/orders")
+
+
+@pytest.mark.asyncio
+async def test_error_status_raises_http_status_error():
+    """4xx/5xx responses raise httpx.HTTPStatusError."""
+
+    async with _client(lambda request: httpx.Response(503)) as client:
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await client._make_request("GET", "/orders")
+
+    assert excinfo.value.response.status_code == 503
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", [b"", b"<html>Bad gateway</html>"])
+async def test_non_json_body_raises_httpx_error(content):
+    """Empty or HTML bodies raise an httpx.HTTPError, not a bare ValueError."""
+
+    async with _client(lambda request: httpx.Response(200, content=content)) as client:
+        with pytest.raises(httpx.DecodingError):
+            await client._make_request("GET", "/orders")
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_propagate():
+    """Connection failures surface as the transport's httpx error."""
+
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async with _client(handler) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client._make_request("GET", "/orders")
+
+
+def _order_handler(request):
+    """Accept every order except scrip 'BAD', which the API rejects."""
+    order = orjson.loads(request.content)
+    if order["scrip_code"] == "BAD":
+        return httpx.Response(400, json={"error": "rejected"})
+    return httpx.Response(200, json={"order_id": order["scrip_code"]})
+
+
+@pytest.mark.asyncio
+async def test_place_orders_returns_results_in_order():
+    """Batch results line up with the submitted orders."""
+    orders = [{"scrip_code": code} for code in ("A", "B", "C")]
+
+    async with _client(_order_handler) as client:
+        results = await client.placeOrders(orders)
+
+    assert results == [{"order_id": "A"}, {"order_id": "B"}, {"order_id": "C"}]
+
+
+@pytest.mark.asyncio
+async def test_place_orders_raises_on_failure_by_default():
+    """Without return_exceptions the first failure propagates."""
+    orders = [{"scrip_code": "A"}, {"scrip_code": "BAD"}]
+
+    async with _client(_order_handler) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.placeOrders(orders)
+
+
+@pytest.mark.asyncio
+async def test_place_orders_returns_exceptions_in_place():
+    """With return_exceptions a failed order is returned, not raised."""
+    orders = [{"scrip_code": "A"}, {"scrip_code": "BAD"}, {"scrip_code": "C"}]
+
+    async with _client(_order_handler) as client:
+        results = await client.placeOrders(orders, return_exceptions=True)
+
+    assert results[0] == {"order_id": "A"}
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[2] == {"order_id": "C"}
+
+
+_PORTFOLIO = {
+    "/v1/portfolio/holdings": {"holdings": [{"isin": "A"}]},
+    "/v1/portfolio/positions": {"net": []},
+    "/v1/orders": {"orders": [{"id": 1}]},
+    "/v1/orders/trades": {"trades": [{"id": 2}]},
+}
+
+
+def _portfolio_handler(failing_path=None):
+    """Serve the four portfolio endpoints, failing one if asked."""
+
+    def handler(request):
+        assert request.url.params["customer_id"] == "42"
+        if request.url.path == failing_path:
+            return httpx.Response(500)
+        return httpx.Response(200, json=_PORTFOLIO[request.url.path])
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_combines_all_four_calls():
+    """The snapshot holds holdings, positions, orders and trades."""
+    async with _client(_portfolio_handler()) as client:
+        snapshot = await client.portfolio_snapshot("42")
+
+    assert snapshot == {
+        "holdings": [{"isin": "A"}],
+        "positions": {"net": []},
+        "orders": [{"id": 1}],
+        "trades": [{"id": 2}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_fails_if_one_call_fails():
+    """A failure in any leg propagates rather than returning partial data."""
+    async with _client(_portfolio_handler("/v1/portfolio/positions")) as client:
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await client.portfolio_snapshot("42")
+
+    assert excinfo.value.request.url.path == "/v1/portfolio/positions"
@@ -0,0 +1,32 @@
+"""Tests for settings validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from sharekhan_connect_mcp.config import Settings
+
+
+def _settings(**overrides):
+    values = {
+        "sharekhan_api_key": "key",
+        "sharekhan_secret_key": "secret",
+        "sharekhan_customer_id": "123",
+    }
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+def test_valid_credentials_are_accepted():
+    """Non-empty string credentials pass validation."""
+    settings = _settings()
+
+    assert settings.sharekhan_api_key == "key"
+    assert settings.sharekhan_secret_key == "secret"
+
+
+@pytest.mark.parametrize("field", ["sharekhan_api_key", "sharekhan_secret_key"])
+@pytest.mark.parametrize("value", ["", "   ", 123, None])
+def test_invalid_credentials_raise_validation_error(field, value):
+    """Blank or non-string credentials raise ValidationError, not AttributeError."""
+    with pytest.raises(ValidationError):
+        _settings(**{field: value})
@@ -0,0 +1,119 @@
+"""Tests for the rotating log file sink."""
+
+import os
+import time
+import zipfile
+from unittest import mock
+
+import pytest
+
+from sharekhan_connect_mcp.logger import RotatingFileSink
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """Path of a log file inside a fresh directory."""
+    return tmp_path / "app.log"
+
+
+def _archives(log_path):
+    return sorted(log_path.parent.glob("app.*.log.zip"))
+
+
+def test_writes_append_below_the_limit(log_path):
+    """Messages under max_bytes stay in the live file without rotating."""
+    sink = RotatingFileSink(str(log_path), max_bytes=100)
+    sink.write("one\n")
+    sink.write("two\n")
+    sink.stop()
+
+    assert log_path.read_text() == "one\ntwo\n"
+    assert _archives(log_path) == []
+
+
+def test_rotation_zips_the_full_file(log_path):
+    """Crossing max_bytes archives the old contents and starts a new file."""
+    sink = RotatingFileSink(str(log_path), max_bytes=10)
+    sink.write("12345678\n")
+    sink.write("next\n")
+    sink.stop()
+
+    [archive] = _archives(log_path)
+    with zipfile.ZipFile(archive) as zf:
+        [name] = zf.namelist()
+        assert zf.read(name) == b"12345678\n"
+    assert log_path.read_text() == "next\n"
+    assert not (log_path.parent / name).exists()
+
+
+def test_size_counts_existing_file_contents(log_path):
+    """Reopening an existing log resumes counting from its current size."""
+    log_path.write_text("123456789\n")
+
+    sink = RotatingFileSink(str(log_path), max_bytes=12)
+    sink.write("abc\n")
+    sink.stop()
+
+    assert len(_archives(log_path)) == 1
+    assert log_path.read_text() == "abc\n"
+
+
+def test_oversized_message_goes_to_an_empty_file(log_path):
+    """A single message larger than max_bytes is written, not rotated away."""
+    sink = RotatingFileSink(str(log_path), max_bytes=4)
+    sink.write("much too long\n")
+    sink.stop()
+
+    assert log_path.read_text() == "much too long\n"
+    assert _archives(log_path) == []
+
+
+def test_rotation_prunes_expired_archives(log_path):
+    """Archives older than the retention period are removed on rotation."""
+    stale = log_path.parent / "app.2000-01-01_00-00-00_000000.log.zip"
+    fresh = log_path.parent / "app.2100-01-01_00-00-00_000000.log.zip"
+    unrelated = log_path.parent / "other.2000-01-01.log.zip"
+    for path in (stale, fresh, unrelated):
+        path.write_bytes(b"")
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+    os.utime(unrelated, (old, old))
+
+    sink = RotatingFileSink(str(log_path), max_bytes=4, retention_seconds=60)
+    sink.write("full\n")
+    sink.write("rotate\n")
+    sink.stop()
+
+    assert not stale.exists()
+    assert fresh.exists()
+    assert unrelated.exists()
+    assert len(_archives(log_path)) == 2
+
+
+def test_rotation_survives_a_deleted_live_file(log_path):
+    """A log file removed underneath the sink does not stop later writes."""
+    sink = RotatingFileSink(str(log_path), max_bytes=12)
+    sink.write("12345678\n")
+    log_path.unlink()
+
+    sink.write("after\n")
+    sink.write("more\n")
+    sink.stop()
+
+    assert log_path.read_text() == "after\nmore\n"
+    assert _archives(log_path) == []
+
+
+def test_failed_archive_keeps_rotated_file(log_path):
+    """If zipping fails, the rotated contents stay on disk and writes go on."""
+    sink = RotatingFileSink(str(log_path), max_bytes=12)
+    sink.write("12345678\n")
+    with mock.patch.object(zipfile, "ZipFile", side_effect=OSError("disk full")):
+        sink.write("next\n")
+    sink.write("again\n")
+    sink.stop()
+
+    [rotated] = log_path.parent.glob("app.*.log")
+    assert rotated.read_text() == "12345678\n"
+    assert _archives(log_path) == []
+    assert log_path.read_text() == "next\nagain\n"
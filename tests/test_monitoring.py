@@ -0,0 +1,95 @@
+"""Tests for the metrics collector."""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from sharekhan_connect_mcp.monitoring import MetricsCollector, RequestMetrics
+
+
+@pytest.fixture
+def collector():
+    """Collector that never scans the connection table."""
+    return MetricsCollector(collect_connections=False)
+
+
+def _request(ts, status_code=200, response_time=0.1):
+    return RequestMetrics(
+        endpoint="/tools/get_quote",
+        method="POST",
+        status_code=status_code,
+        response_time=response_time,
+        timestamp=datetime.now(),
+        ts=ts,
+    )
+
+
+def test_late_metric_joins_its_existing_minute(collector):
+    """A metric for an earlier, still-retained minute lands in that bucket."""
+    collector.record_request(_request(ts=60 * 9 + 5))
+    collector.record_request(_request(ts=60 * 10 + 5))
+    collector.record_request(_request(ts=60 * 9 + 59))
+
+    assert [(b.minute, b.requests) for b in collector._buckets] == [(9, 2), (10, 1)]
+
+
+def test_late_metric_never_appends_an_older_minute(collector):
+    """Buckets stay ordered when a metric arrives for a minute with no bucket."""
+    collector.record_request(_request(ts=60 * 8))
+    collector.record_request(_request(ts=60 * 10))
+    collector.record_request(_request(ts=60 * 9 + 30))
+
+    minutes = [b.minute for b in collector._buckets]
+    assert minutes == sorted(minutes) == [8, 10]
+    assert sum(b.requests for b in collector._buckets) == 3
+
+
+def test_summary_counts_late_metrics_inside_window(collector):
+    """Out-of-order recording does not hide requests from the summary."""
+    now = time.monotonic()
+    collector.record_request(_request(ts=now))
+    collector.record_request(_request(ts=now - 90, status_code=500))
+
+    summary = collector.get_summary_metrics(time_window_minutes=5)
+
+    assert summary["request_metrics"]["total_requests"] == 2
+    assert summary["request_metrics"]["error_requests"] == 1
+
+
+def test_summary_excludes_minutes_outside_window(collector):
+    """Requests older than the window are not counted."""
+    now = time.monotonic()
+    collector.record_request(_request(ts=now - 600, response_time=9.0))
+    collector.record_request(_request(ts=now, response_time=0.2))
+    collector.record_request(_request(ts=now, response_time=0.4))
+
+    metrics = collector.get_summary_metrics(time_window_minutes=5)["request_metrics"]
+
+    assert metrics["total_requests"] == 2
+    assert metrics["max_response_time_ms"] == pytest.approx(400)
+    assert metrics["min_response_time_ms"] == pytest.approx(200)
+    assert metrics["avg_response_time_ms"] == pytest.approx(300)
+
+
+def test_summary_counts_errors_by_type(collector):
+    """Recorded errors are summed per type from the buckets."""
+    collector.record_request(_request(ts=time.monotonic()))
+    collector.record_error("timeout", {})
+    collector.record_error("timeout", {})
+    collector.record_error("auth", {})
+
+    errors = collector.get_summary_metrics()["error_metrics"]
+
+    assert errors["total_errors"] == 3
+    assert errors["errors_by_type"] == {"timeout": 2, "auth": 1}
+    assert errors["error_rate"] == 3
+
+
+def test_bucket_history_is_bounded():
+    """Only the most recent bucket_minutes minutes are retained."""
+    collector = MetricsCollector(bucket_minutes=3, collect_connections=False)
+    for minute in range(1, 6):
+        collector.record_request(_request(ts=60 * minute))
+
+    assert [b.minute for b in collector._buckets] == [3, 4, 5]
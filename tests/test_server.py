@@ -0,0 +1,162 @@
+"""Tests for the FastAPI server routes and middleware."""
+
+from unittest import mock
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from sharekhan_connect_mcp.config import Settings
+from sharekhan_connect_mcp.server import SharekhanMCPServer, ndjson_chunks
+
+
+@pytest.fixture
+def server():
+    """Server built from test settings; the lifespan is not run."""
+    settings = Settings(
+        _env_file=None,
+        sharekhan_api_key="key",
+        sharekhan_secret_key="secret",
+        sharekhan_customer_id="123",
+    )
+    server = SharekhanMCPServer(settings)
+    yield server
+    server.client.close()
+
+
+@pytest.fixture
+def http(server):
+    """Test client for the server's app."""
+    return TestClient(server.app)
+
+
+def test_preflight_is_answered_by_cors_middleware(http):
+    """Preflight requests echo the origin, methods and requested headers."""
+    response = http.options(
+        "/tools/get_quote",
+        headers={
+            "Origin": "https://app.example",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "X-Custom, Content-Type",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.text == "OK"
+    assert response.headers["access-control-allow-origin"] == "https://app.example"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "POST" in response.headers["access-control-allow-methods"]
+    assert response.headers["access-control-allow-headers"] == "X-Custom, Content-Type"
+    assert response.headers["access-control-max-age"] == "600"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_simple_request_gets_cors_headers(http):
+    """Responses to cross-origin requests carry the origin and Vary headers."""
+    response = http.get("/", headers={"Origin": "https://app.example"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert response.headers["access-control-allow-origin"] == "https://app.example"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_request_without_origin_has_no_cors_headers(http):
+    """Same-origin requests pass through the middleware untouched."""
+    response = http.get("/")
+
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_options_without_preflight_header_is_routed(http):
+    """An OPTIONS request lacking a requested method is not a preflight."""
+    response = http.options("/", headers={"Origin": "https://app.example"})
+
+    assert response.status_code == 405
+    assert response.headers["access-control-allow-origin"] == "https://app.example"
+
+
+def _errors(response):
+    return [(error["type"], error["loc"]) for error in response.json()["detail"]]
+
+
+def test_tool_input_of_wrong_type_is_422(http):
+    """A body field of the wrong type is rejected with a 422, not a 500."""
+    response = http.post("/tools/get_holdings", json={"customer_id": 42})
+
+    assert response.status_code == 422
+    assert _errors(response) == [("string_type", ["customer_id"])]
+
+
+def test_tool_input_with_extra_field_is_422(http):
+    """Fields the input model does not declare are rejected."""
+    response = http.post(
+        "/tools/get_quote",
+        json={"exchange": "NC", "scrip_code": "2885", "side": "BUY"},
+    )
+
+    assert response.status_code == 422
+    assert _errors(response) == [("extra_forbidden", ["side"])]
+
+
+def test_nested_tool_input_error_has_full_location(http):
+    """Errors inside nested models report their path within the body."""
+    order = {
+        "exchange": "NC",
+        "scrip_code": "2885",
+        "quantity": 0,
+        "transaction_type": "BUY",
+        "order_type": "MARKET",
+        "product": "CNC",
+    }
+    response = http.post("/tools/place_orders_batch", json={"orders": [order]})
+
+    assert response.status_code == 422
+    assert _errors(response) == [("greater_than", ["orders", 0, "quantity"])]
+
+
+@pytest.fixture
+def holdings(server):
+    """Authenticated session whose holdings lookup returns two rows."""
+    rows = [{"isin": "A", "qty": 1}, {"isin": "B", "qty": 2}]
+    server.session_manager.is_token_valid = lambda: True
+    server.client.holdings = mock.Mock(return_value=rows)
+    return rows
+
+
+def test_list_result_streams_as_ndjson(http, holdings):
+    """Clients accepting NDJSON get one JSON row per line."""
+    response = http.post(
+        "/tools/get_holdings",
+        json={"customer_id": "42"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [orjson.loads(line) for line in lines] == holdings
+    assert response.text.endswith("\n")
+
+
+def test_list_result_without_ndjson_accept_is_json(http, holdings):
+    """Other clients still receive the status/data JSON object."""
+    response = http.post(
+        "/tools/get_holdings",
+        json={"customer_id": "42"},
+        headers={"Accept": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"status": "success", "data": holdings}
+
+
+def test_ndjson_chunks_batches_rows():
+    """Rows are split into chunks of batch_size, each row newline-terminated."""
+    chunks = list(ndjson_chunks([{"i": i} for i in range(5)], batch_size=2))
+
+    assert chunks == [b'{"i":0}\n{"i":1}\n', b'{"i":2}\n{"i":3}\n', b'{"i":4}\n']
@@ -0,0 +1,115 @@
+"""Tests for the session manager."""
+
+import asyncio
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from sharekhan_connect_mcp.client import SharekhanClient
+from sharekhan_connect_mcp.session import SharekhanSessionManager
+
+
+@pytest.fixture
+def session_manager():
+    """Session manager over a client that is never used for requests."""
+    client = SharekhanClient(api_key="key", secret_key="secret", vendor_key="vendor")
+    yield SharekhanSessionManager(client, customer_id="42")
+    client.close()
+
+
+def _query(url):
+    return parse_qs(urlsplit(url).query)
+
+
+def test_login_url_carries_vendor_and_version(session_manager):
+    """The login URL includes the configured version, state and vendor key."""
+    query = _query(session_manager.get_login_url())
+
+    assert query["api_key"] == ["key"]
+    assert query["version_id"] == ["1005"]
+    assert query["state"] == ["12345"]
+    assert query["vendor_key"] == ["vendor"]
+
+
+def test_login_url_reflects_current_settings(session_manager):
+    """Changing the version or vendor key is picked up by the next URL."""
+    session_manager.get_login_url()
+    session_manager.version_id = "1006"
+
+    query = _query(session_manager.get_login_url(vendor_key="other"))
+
+    assert query["version_id"] == ["1006"]
+    assert query["vendor_key"] == ["other"]
+
+
+def _slow_authenticate(calls, release):
+    def authenticate(request_token, customer_id=None):
+        calls.append(request_token)
+        release.wait(timeout=5)
+        return True
+
+    return authenticate
+
+
+@pytest.mark.asyncio
+async def test_concurrent_authentications_share_one_attempt(session_manager):
+    """Callers with the same request token share a single authenticate call."""
+    calls = []
+    release = threading.Event()
+    session_manager.authenticate = _slow_authenticate(calls, release)
+
+    pending = [
+        asyncio.ensure_future(session_manager.authenticate_async("token-a"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await asyncio.gather(*pending) == [True, True, True]
+    assert calls == ["token-a"]
+    assert session_manager._auth_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_distinct_tokens_authenticate_separately(session_manager):
+    """Different request tokens are not coalesced."""
+    calls = []
+    release = threading.Event()
+    release.set()
+    session_manager.authenticate = _slow_authenticate(calls, release)
+
+    await asyncio.gather(
+        session_manager.authenticate_async("token-a"),
+        session_manager.authenticate_async("token-b"),
+    )
+
+    assert sorted(calls) == ["token-a", "token-b"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_attempt(session_manager):
+    """One waiter being cancelled leaves the other waiter's result intact."""
+    calls = []
+    release = threading.Event()
+    session_manager.authenticate = _slow_authenticate(calls, release)
+
+    first = asyncio.ensure_future(session_manager.authenticate_async("token-a"))
+    second = asyncio.ensure_future(session_manager.authenticate_async("token-a"))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    release.set()
+
+    assert await second is True
+    assert first.cancelled()
+    assert calls == ["token-a"]
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_not_reused(session_manager):
+    """After an attempt finishes, the next call authenticates afresh."""
+    results = iter([False, True])
+    session_manager.authenticate = lambda token, customer_id=None: next(results)
+
+    assert await session_manager.authenticate_async("token-a") is False
+    assert await session_manager.authenticate_async("token-a") is True
@@ -0,0 +1,128 @@
+"""Tests for the MCP tool layer."""
+
+import contextlib
+
+import httpx
+import orjson
+import pytest
+
+from sharekhan_connect_mcp.client import SharekhanClient
+from sharekhan_connect_mcp.client_async import AsyncSharekhanClient
+from sharekhan_connect_mcp.session import SharekhanSessionManager
+from sharekhan_connect_mcp.tools import BatchOrderInput, SharekhanMCPTools
+
+
+@contextlib.asynccontextmanager
+async def _tools(handler):
+    """Authenticated tools whose async client is answered by handler."""
+    client = SharekhanClient(api_key="key", secret_key="secret")
+    client.access_token = "token"
+    session_manager = SharekhanSessionManager(client)
+    session_manager.is_token_valid = lambda: True
+    async_client = AsyncSharekhanClient(
+        api_key="key", secret_key="secret", transport=httpx.MockTransport(handler)
+    )
+    try:
+        yield SharekhanMCPTools(client, session_manager, async_client=async_client)
+    finally:
+        await async_client.aclose()
+        client.close()
+
+
+def _order(scrip_code):
+    return {
+        "exchange": "NC",
+        "scrip_code": scrip_code,
+        "quantity": 1,
+        "transaction_type": "BUY",
+        "order_type": "MARKET",
+        "product": "CNC",
+    }
+
+
+def _order_handler(request):
+    """Accept every order except scrip 'BAD', which the API rejects."""
+    order = orjson.loads(request.content)
+    if order["scrip_code"] == "BAD":
+        return httpx.Response(400, json={"error": "rejected"})
+    return httpx.Response(200, json={"order_id": order["scrip_code"]})
+
+
+@pytest.mark.asyncio
+async def test_order_batch_reports_each_order():
+    """A partly failing batch succeeds overall with a status per order."""
+    batch = BatchOrderInput(orders=[_order("A"), _order("BAD"), _order("C")])
+
+    async with _tools(_order_handler) as tools:
+        result = await tools.place_orders_batch(batch)
+
+    assert result["status"] == "success"
+    first, failed, last = result["data"]
+    assert first == {"status": "success", "data": {"order_id": "A"}}
+    assert failed["status"] == "error"
+    assert "400" in failed["message"]
+    assert last == {"status": "success", "data": {"order_id": "C"}}
+
+
+@pytest.mark.asyncio
+async def test_order_batch_sends_the_async_client_the_session_token():
+    """The batch runs with the sync client's current access token."""
+    tokens = []
+
+    def handler(request):
+        tokens.append(request.headers["Authorization"])
+        return _order_handler(request)
+
+    async with _tools(handler) as tools:
+        await tools.place_orders_batch(BatchOrderInput(orders=[_order("A")]))
+
+    assert tokens == ["Bearer token"]
+
+
+@pytest.mark.asyncio
+async def test_order_batch_requires_authentication():
+    """Unauthenticated batches are refused before any order is sent."""
+
+    def handler(request):
+        raise AssertionError("request should not be sent")
+
+    async with _tools(handler) as tools:
+        tools.session_manager.is_token_valid = lambda: False
+        result = await tools.place_orders_batch(BatchOrderInput(orders=[_order("A")]))
+
+    assert result == {"status": "error", "message": "Authentication required"}
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_tool_wraps_snapshot():
+    """The snapshot tool returns all four sections on success."""
+    sections = {
+        "/v1/portfolio/holdings": {"holdings": []},
+        "/v1/portfolio/positions": {"net": []},
+        "/v1/orders": {"orders": []},
+        "/v1/orders/trades": {"trades": []},
+    }
+
+    async with _tools(
+        lambda r: httpx.Response(200, json=sections[r.url.path])
+    ) as tools:
+        result = await tools.get_portfolio_snapshot("42")
+
+    assert result["status"] == "success"
+    assert set(result["data"]) == {"holdings", "positions", "orders", "trades"}
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_tool_reports_failed_leg():
+    """One failing endpoint turns the whole snapshot into an error result."""
+
+    def handler(request):
+        if request.url.path == "/v1/orders/trades":
+            return httpx.Response(502)
+        return httpx.Response(200, json={})
+
+    async with _tools(handler) as tools:
+        result = await tools.get_portfolio_snapshot("42")
+
+    assert result["status"] == "error"
+    assert "502" in result["message"]
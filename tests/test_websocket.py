@@ -0,0 +1,238 @@
+"""Tests for the WebSocket market data client."""
+
+import asyncio
+import contextlib
+
+import orjson
+import pytest
+import websockets
+from websockets.asyncio.server import serve
+
+from sharekhan_connect_mcp.websocket import SharekhanWebSocketClient
+
+
+class FakeConnection:
+    """Connection stub serving queued frames, then closing or idling."""
+
+    def __init__(self, frames, close_when_empty=True):
+        self.frames = list(frames)
+        self.close_when_empty = close_when_empty
+        self.sent = []
+        self.closed = asyncio.Event()
+
+    async def recv(self, decode=None):
+        await asyncio.sleep(0)
+        if self.frames:
+            return self.frames.pop(0)
+        if not self.close_when_empty:
+            await self.closed.wait()
+        raise websockets.exceptions.ConnectionClosed(None, None)
+
+    async def send(self, frame):
+        self.sent.append(frame)
+
+    async def close(self):
+        self.closed.set()
+
+
+def _ticks(count):
+    return [orjson.dumps({"type": "tick", "i": i}) for i in range(count)]
+
+
+def _connected_client(connection):
+    client = SharekhanWebSocketClient("token")
+    client.websocket = connection
+    client.is_connected = True
+    return client
+
+
+def _other_tasks():
+    current = asyncio.current_task()
+    return [task for task in asyncio.all_tasks() if task is not current]
+
+
+@pytest.mark.asyncio
+async def test_inbox_delivers_every_frame_in_order():
+    """Frames read by the listener reach callbacks once each, in order."""
+    client = _connected_client(FakeConnection(_ticks(300)))
+    received = []
+    client.add_callback("ticks", lambda data: received.append(data["i"]))
+
+    await client._receive_messages()
+
+    assert received == list(range(300))
+    assert client._dispatcher_task is None
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_full_inbox_applies_backpressure_without_dropping():
+    """A slow consumer behind a tiny inbox still receives every frame."""
+    client = _connected_client(FakeConnection(_ticks(50)))
+    client.INBOX_MAXSIZE = 2
+    received = []
+
+    async def slow_callback(data):
+        await asyncio.sleep(0)
+        received.append(data["i"])
+
+    client.add_callback("ticks", slow_callback)
+
+    await client._receive_messages()
+
+    assert received == list(range(50))
+
+
+@pytest.mark.asyncio
+async def test_cancelling_listener_also_stops_dispatcher():
+    """A listener cancelled mid-dispatch leaves no dispatcher task behind."""
+    client = _connected_client(FakeConnection(_ticks(1), close_when_empty=False))
+    started = asyncio.Event()
+
+    async def blocking_callback(data):
+        started.set()
+        await asyncio.Event().wait()
+
+    client.add_callback("ticks", blocking_callback)
+    listener = asyncio.create_task(client._receive_messages())
+    await asyncio.wait_for(started.wait(), 1)
+    dispatcher = client._dispatcher_task
+
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert dispatcher is not None and dispatcher.cancelled()
+    assert client._dispatcher_task is None
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_listener_and_dispatcher():
+    """disconnect() from outside cancels and awaits the background tasks."""
+    client = _connected_client(FakeConnection([], close_when_empty=False))
+    client._listener_task = asyncio.create_task(client._message_listener())
+    await asyncio.sleep(0.01)
+    assert client._dispatcher_task is not None
+
+    await asyncio.wait_for(client.disconnect(), 1)
+
+    assert client._listener_task is None
+    assert client._dispatcher_task is None
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_cancelling_listener_while_draining_stops_dispatcher():
+    """Cancellation during the final drain after a close is not leaked."""
+    client = _connected_client(FakeConnection(_ticks(1)))
+    started = asyncio.Event()
+
+    async def blocking_callback(data):
+        started.set()
+        await asyncio.Event().wait()
+
+    client.add_callback("ticks", blocking_callback)
+    listener = asyncio.create_task(client._receive_messages())
+    await asyncio.wait_for(started.wait(), 1)
+    await asyncio.sleep(0.01)
+
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert client._dispatcher_task is None
+    assert _other_tasks() == []
+
+
+@contextlib.asynccontextmanager
+async def _local_feed():
+    """Local feed that sends one tick and then keeps the connection open."""
+
+    async def handler(connection):
+        await connection.send('{"type": "tick", "i": 1}')
+        await asyncio.sleep(5)
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://127.0.0.1:{port}"
+
+
+def _disconnecting_client(url):
+    """Client whose tick callback disconnects it, recording the live tasks."""
+    client = SharekhanWebSocketClient("token", ws_url=url)
+    seen = {}
+
+    async def disconnect_on_tick(data):
+        seen["listener"] = client._listener_task
+        seen["dispatcher"] = client._dispatcher_task
+        await client.disconnect()
+        seen["returned"] = True
+
+    client.add_callback("ticks", disconnect_on_tick)
+    return client, seen
+
+
+@pytest.mark.asyncio
+async def test_disconnect_from_callback_after_connect():
+    """A callback awaiting disconnect() returns and every task winds down."""
+    async with _local_feed() as url:
+        client, seen = _disconnecting_client(url)
+        client.should_run = True
+
+        assert await client.connect()
+        listener = client._listener_task
+        await asyncio.wait_for(asyncio.gather(listener, return_exceptions=True), 2)
+
+    assert seen["returned"] is True
+    assert seen["listener"] is listener
+    assert listener.done()
+    assert seen["dispatcher"].done()
+    assert client._dispatcher_task is None
+    assert not client.is_connected
+
+
+@pytest.mark.asyncio
+async def test_disconnect_from_callback_under_run():
+    """run() ends cleanly when one of its callbacks disconnects the client."""
+    async with _local_feed() as url:
+        client, seen = _disconnecting_client(url)
+
+        await asyncio.wait_for(client.run(), 2)
+
+    assert seen["returned"] is True
+    assert seen["dispatcher"].done()
+    assert client._dispatcher_task is None
+    assert not client.should_run
+
+
+class FailingConnection(FakeConnection):
+    """Connection whose reads fail with an unexpected error."""
+
+    async def recv(self, decode=None):
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_disconnect_from_error_callback():
+    """An error callback awaiting disconnect() returns and the listener ends."""
+    client = _connected_client(FailingConnection([]))
+    client.should_run = True
+    seen = {}
+
+    async def disconnect_on_error(error):
+        seen["error"] = error
+        await client.disconnect()
+        seen["returned"] = True
+
+    client.add_callback("errors", disconnect_on_error)
+    listener = client._listener_task = asyncio.create_task(client._message_listener())
+    await asyncio.wait_for(asyncio.gather(listener, return_exceptions=True), 2)
+
+    assert isinstance(seen["error"], RuntimeError)
+    assert seen["returned"] is True
+    assert client._listener_task is None
+    assert client._dispatcher_task is None
+    assert not client.should_run
+    assert _other_tasks() == []